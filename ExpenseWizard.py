@@ -1,16 +1,178 @@
+import time
+# Taken before anything else is imported, so --debug-startup can report the import phase too
+STARTED = time.perf_counter()
 import sys
 import os
 import json
+import shutil
 import traceback
+import multiprocessing
+import threading
+from contextlib import nullcontext
+from functools import partial
 from PyQt5.QtWidgets import (
     QApplication, QWidget, QPushButton, QVBoxLayout, QHBoxLayout,
-    QFileDialog, QLineEdit, QLabel, QTextEdit, QSpinBox, QDialog, QComboBox, QDateEdit, QMainWindow, QAction, QWidgetAction
+    QFileDialog, QLineEdit, QLabel, QTextEdit, QSpinBox, QDialog, QComboBox, QDateEdit, QMainWindow, QAction, QWidgetAction,
+    QTreeWidget, QTreeWidgetItem
 )
 
-from PyQt5.QtCore import Qt, QTimer, QPoint, QDate
+from PyQt5.QtCore import Qt, QTimer, QPoint, QDate, QObject, QThread, pyqtSignal
 from PyQt5.QtGui import QFont, QIcon
 
-from expense_sorter import main_processing_function
+# The report pipeline (pandas, numpy, openpyxl) is imported where it is first used, or by ModuleWarmer in
+# the background once the window is up, so the window appears with only PyQt loaded
+from report_profiler import ReportTrace, TRACE_FILENAME
+from report_paths import default_cache_dir, default_render_cache_dir, default_store_path
+
+# Quiet time after the last date or grouping change before the preview recomputes
+PREVIEW_DEBOUNCE_MS = 200
+
+class StartupTimer:
+    # Prints how long each startup phase took; silent unless ExpenseWizard is run with --debug-startup
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.last = STARTED
+
+    def mark(self, phase):
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        print(f"[startup] {phase:<24}{(now - self.last) * 1000:8.0f} ms{(now - STARTED) * 1000:8.0f} ms total",
+              file=sys.stderr, flush=True)
+        self.last = now
+
+
+class ModuleWarmer(QObject):
+    finished = pyqtSignal()
+
+    def run(self):
+        # Runs on a plain thread after the window is shown; the first report then starts without the import cost
+        import expense_sorter, category_rules, summary_preview, folder_watch
+        self.finished.emit()
+
+
+class CategoryRulesCache:
+    # Parsed rules are kept between runs so their merchant memo is reused until the file changes. Only
+    # worker threads load them: parsing imports pandas and builds the keyword matcher
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.key = None
+        self.rules = None
+
+    def load(self, path):
+        if not path:
+            return None
+        from category_rules import load_category_rules
+        with self.lock:
+            key = (path, os.stat(path).st_mtime_ns)
+            if key != self.key:
+                self.rules = load_category_rules(path)
+                self.key = key
+            return self.rules
+
+    def load_quietly(self, path):
+        # For the watcher; a broken rules file is reported when the preview or a report loads it
+        try:
+            return self.load(path)
+        except (OSError, ValueError):
+            return None
+
+
+class ReportJob(QObject):
+    log = pyqtSignal(str)
+    progress = pyqtSignal(str, int, int)
+    finished = pyqtSignal(str)
+    failed = pyqtSignal(str, str)
+    cancelled = pyqtSignal()
+
+    def __init__(self, trace=None, lock=None, rules=None, rules_path="", render_cache_dir=None, **kwargs):
+        super().__init__()
+        self.kwargs = kwargs
+        self.trace = trace
+        self.lock = lock
+        self.rules = rules
+        self.rules_path = rules_path
+        self.render_cache_dir = render_cache_dir
+        self.cancel_event = threading.Event()
+
+    def run(self):
+        # Runs on the worker thread; results reach the GUI only through signals
+        from expense_sorter import main_processing_function, ReportCancelled
+        from render_cache import RenderCache
+        try:
+            category_rules = self.rules.load(self.rules_path) if self.rules else None
+        except (OSError, ValueError) as e:
+            self.failed.emit(f"Categorization rules: {e}", "")
+            return
+        if category_rules:
+            self.log.emit(f"\U0001F3F7\uFE0F {len(category_rules)} categorization rules")
+        render_cache = RenderCache(self.render_cache_dir) if self.render_cache_dir else None
+        try:
+            with self.lock or nullcontext():
+                path = main_processing_function(**self.kwargs, category_rules=category_rules, render_cache=render_cache,
+                                                log=self.log.emit, progress=self.progress.emit,
+                                                cancel_event=self.cancel_event, trace=self.trace)
+        except ReportCancelled:
+            self.cancelled.emit()
+        except Exception as e:
+            self.failed.emit(str(e), traceback.format_exc())
+        else:
+            if self.trace:
+                self.report_trace()
+            self.finished.emit(path)
+
+    def report_trace(self):
+        self.log.emit("\u23F1\uFE0F Stage timings:")
+        self.log.emit(f"<pre>{self.trace.summary()}</pre>")
+        trace_path = os.path.join(self.kwargs["output_folder"], TRACE_FILENAME)
+        try:
+            self.trace.save(trace_path)
+            self.log.emit(f"\U0001F4CA Trace saved to: {trace_path}")
+        except OSError as e:
+            self.log.emit(f"\u274C Could not save trace: {e}")
+
+    def cancel(self):
+        self.cancel_event.set()
+
+
+class WatchSignals(QObject):
+    # Carries the folder watcher's callbacks from its thread to the GUI thread
+    log = pyqtSignal(str)
+    ingested = pyqtSignal(object)
+
+
+class PreviewLoader(QObject):
+    loaded = pyqtSignal(object)
+    failed = pyqtSignal(str)
+
+    def __init__(self, folder_path, rules=None, rules_path="", lock=None):
+        super().__init__()
+        self.folder_path = folder_path
+        self.rules = rules
+        self.rules_path = rules_path
+        self.lock = lock
+        self.cancel_event = threading.Event()
+
+    def run(self):
+        # Runs on a worker thread; afterwards every preview query is answered from memory
+        from expense_sorter import load_category_cube, list_statement_files
+        from summary_preview import SummaryPreview
+        try:
+            category_rules = self.rules.load(self.rules_path) if self.rules else None
+        except (OSError, ValueError) as e:
+            self.failed.emit(f"Categorization rules: {e}")
+            return
+        try:
+            with self.lock or nullcontext():
+                cube = load_category_cube(self.folder_path, list_statement_files(self.folder_path),
+                                          cancel_event=self.cancel_event, category_rules=category_rules)
+        except Exception as e:
+            self.failed.emit(str(e))
+        else:
+            self.loaded.emit(SummaryPreview(cube))
+
+    def cancel(self):
+        self.cancel_event.set()
 
 class GuidedStepOverlay(QDialog):
     def __init__(self, target_widget, message, parent=None):
@@ -70,7 +232,8 @@ class HelpDialog(QDialog):
     "This tool helps you organize and summarize your credit card transactions across any custom date range.<br><br>"
 
     "<b>1. 📁 Select your Input Folder:</b><br>"
-    "Choose a folder containing one or more Discover card <code>.xlsx</code> statement files.<br><br>"
+    "Choose a folder containing one or more credit card statement exports (<code>.xlsx</code>, <code>.csv</code>, <code>.ofx</code> or <code>.qfx</code>). "
+    "Discover, Chase, Capital One, Citi and American Express layouts are recognized from their header row.<br><br>"
 
     "<b>2. 💾 Choose your Save File name:</b><br>"
     "This is where the summary will be saved.<br>"
@@ -114,17 +277,46 @@ class HelpDialog(QDialog):
         self.setLayout(layout)
 
 class ExpenseSorterGUI(QMainWindow):
-    def __init__(self):
+    def __init__(self, startup=None):
         super().__init__()
+        self.startup = startup or StartupTimer()
         self.setWindowTitle("Expense Wizard")
         self.setWindowIcon(QIcon("app_icon.ico"))
-        self.resize(700,400)
+        self.resize(700,600)
         central_widget = QWidget()
         self.setCentralWidget(central_widget)
         self.main_layout = QVBoxLayout()
         central_widget.setLayout(self.main_layout)
         
 
+        self.job = None
+        self.job_thread = None
+        self.rules_path = ""
+        self.rules = CategoryRulesCache()
+        # Set once the report pipeline has been imported in the background
+        self.warmed = False
+        self.preview = None
+        self.preview_loader = None
+        self.preview_thread = None
+        # Set when the folder or rules change while a report or a preview load is running
+        self.preview_stale = False
+        # "report" or "standing" while a run waits for the preview to finish loading
+        self.run_pending = False
+        # Set when statements are ingested while a report runs or waits; the standing report is updated after it
+        self.standing_pending = False
+        # Set by closeEvent; no report or preview load starts after it
+        self.closing = False
+        self.preview_timer = QTimer(self)
+        self.preview_timer.setSingleShot(True)
+        self.preview_timer.setInterval(PREVIEW_DEBOUNCE_MS)
+        self.preview_timer.timeout.connect(self.refresh_preview)
+        # The folder watcher, reports and the preview all write the statement cache; one at a time
+        self.cache_lock = threading.Lock()
+        self.watch_service = None
+        self.watch_signals = WatchSignals()
+        self.watch_signals.log.connect(lambda message: self.log_output.append(f"\U0001F440 {message}"))
+        self.watch_signals.ingested.connect(self.watch_ingested)
+
         self.init_ui()
         
 
@@ -140,7 +332,8 @@ class ExpenseSorterGUI(QMainWindow):
         settings_menu = menubar.addMenu("Settings")
 
         self.export_format_action = QComboBox()
-        self.export_format_action.addItems(["Excel (.xlsx)", "CSV (.csv)"])
+        self.export_format_action.addItems(["Excel (.xlsx)", "CSV (.csv)", "CSV Archive (.zip)", "Parquet Dataset (.parquet)",
+                                            "Arrow Dataset (.arrow)"])
         export_widget = QWidget()
         export_layout = QHBoxLayout()
         export_layout.setContentsMargins(5, 5, 5, 5)
@@ -176,6 +369,63 @@ class ExpenseSorterGUI(QMainWindow):
         export_action.setDefaultWidget(export_widget)
         settings_menu.addAction(export_action)
 
+        self.incremental_action = QAction("Update Existing Report", self)
+        self.incremental_action.setCheckable(True)
+        settings_menu.addAction(self.incremental_action)
+
+        self.store_action = QAction("Use Transaction Store", self)
+        self.store_action.setCheckable(True)
+        settings_menu.addAction(self.store_action)
+
+        self.stream_action = QAction("Stream Large Statements", self)
+        self.stream_action.setCheckable(True)
+        settings_menu.addAction(self.stream_action)
+
+        self.compact_action = QAction("Compact Memory Mode", self)
+        self.compact_action.setCheckable(True)
+        settings_menu.addAction(self.compact_action)
+
+        self.parallel_render_action = QAction("Render Excel Periods in Parallel", self)
+        self.parallel_render_action.setCheckable(True)
+        settings_menu.addAction(self.parallel_render_action)
+
+        self.split_workbook_action = QAction("One Workbook per Period", self)
+        self.split_workbook_action.setCheckable(True)
+        settings_menu.addAction(self.split_workbook_action)
+
+        self.watch_action = QAction("Watch Input Folder", self)
+        self.watch_action.setCheckable(True)
+        settings_menu.addAction(self.watch_action)
+
+        self.standing_action = QAction("Keep Report Up to Date", self)
+        self.standing_action.setCheckable(True)
+        settings_menu.addAction(self.standing_action)
+
+        self.summary_only_action = QAction("Summary Sheets Only", self)
+        self.summary_only_action.setCheckable(True)
+        settings_menu.addAction(self.summary_only_action)
+
+        self.render_cache_action = QAction("Reuse Rendered Periods", self)
+        self.render_cache_action.setCheckable(True)
+        self.render_cache_action.setChecked(True)
+        settings_menu.addAction(self.render_cache_action)
+
+        self.trace_action = QAction("Record Performance Trace", self)
+        self.trace_action.setCheckable(True)
+        settings_menu.addAction(self.trace_action)
+
+        rules_action = QAction("Choose Categorization Rules...", self)
+        rules_action.triggered.connect(self.browse_rules_file)
+        settings_menu.addAction(rules_action)
+
+        clear_rules_action = QAction("Clear Categorization Rules", self)
+        clear_rules_action.triggered.connect(self.clear_rules_file)
+        settings_menu.addAction(clear_rules_action)
+
+        clear_cache_action = QAction("Clear Statement Cache", self)
+        clear_cache_action.triggered.connect(self.clear_cache)
+        settings_menu.addAction(clear_cache_action)
+
 
         folder_layout = QHBoxLayout()
         self.folder_input = QLineEdit()
@@ -219,12 +469,27 @@ class ExpenseSorterGUI(QMainWindow):
         grouping_layout.addWidget(self.grouping)
         layout.addLayout(grouping_layout)
 
+        self.preview_status = QLabel("Select an input folder to preview totals.")
+        layout.addWidget(self.preview_status)
+        self.preview_tree = QTreeWidget()
+        self.preview_tree.setHeaderLabels(["Period / Category", "Amount", "Transactions"])
+        self.preview_tree.setColumnWidth(0, 320)
+        layout.addWidget(self.preview_tree)
+        for signal in (self.start_date.dateChanged, self.end_date.dateChanged, self.grouping.currentTextChanged):
+            signal.connect(self.schedule_preview)
+        self.folder_input.editingFinished.connect(self.load_preview)
+        self.folder_input.editingFinished.connect(self.update_watch)
+
         
 
         button_layout = QHBoxLayout()
         self.run_button = QPushButton("Generate Report")
-        self.run_button.clicked.connect(self.run_script)
+        self.run_button.clicked.connect(lambda: self.run_script())
         button_layout.addWidget(self.run_button)
+        self.cancel_button = QPushButton("Cancel")
+        self.cancel_button.setEnabled(False)
+        self.cancel_button.clicked.connect(self.cancel_job)
+        button_layout.addWidget(self.cancel_button)
         layout.addLayout(button_layout)
 
         
@@ -237,6 +502,8 @@ class ExpenseSorterGUI(QMainWindow):
 
         self.load_preferences()
         self.run_interactive_tutorial()
+        # Fires once the event loop is running, i.e. after the window has been shown
+        QTimer.singleShot(0, self.warm_up)
 
 
     def load_preferences(self):
@@ -261,6 +528,30 @@ class ExpenseSorterGUI(QMainWindow):
                         idx = self.export_format_action.findText(config["export_format"])
                         if idx != -1:
                             self.export_format_action.setCurrentIndex(idx)
+                    if "incremental" in config:
+                        self.incremental_action.setChecked(bool(config["incremental"]))
+                    if "use_store" in config:
+                        self.store_action.setChecked(bool(config["use_store"]))
+                    if "streaming" in config:
+                        self.stream_action.setChecked(bool(config["streaming"]))
+                    if "compact" in config:
+                        self.compact_action.setChecked(bool(config["compact"]))
+                    if "parallel_render" in config:
+                        self.parallel_render_action.setChecked(bool(config["parallel_render"]))
+                    if "workbook_per_period" in config:
+                        self.split_workbook_action.setChecked(bool(config["workbook_per_period"]))
+                    if "watch_folder" in config:
+                        self.watch_action.setChecked(bool(config["watch_folder"]))
+                    if "standing_report" in config:
+                        self.standing_action.setChecked(bool(config["standing_report"]))
+                    if "summary_only" in config:
+                        self.summary_only_action.setChecked(bool(config["summary_only"]))
+                    if "render_cache" in config:
+                        self.render_cache_action.setChecked(bool(config["render_cache"]))
+                    if "category_rules" in config:
+                        self.rules_path = config["category_rules"] or ""
+                    if "trace" in config:
+                        self.trace_action.setChecked(bool(config["trace"]))
                     if "chart_type" in config:
                         idx = self.chart_type_action.findText(config["chart_type"])
                         if idx != -1:
@@ -283,6 +574,18 @@ class ExpenseSorterGUI(QMainWindow):
             "end_date": self.end_date.date().toString("MM-dd-yyyy"),
             "group_by": self.grouping.currentText(),
             "export_format": self.export_format_action.currentText(),
+            "incremental": self.incremental_action.isChecked(),
+            "use_store": self.store_action.isChecked(),
+            "streaming": self.stream_action.isChecked(),
+            "compact": self.compact_action.isChecked(),
+            "parallel_render": self.parallel_render_action.isChecked(),
+            "workbook_per_period": self.split_workbook_action.isChecked(),
+            "watch_folder": self.watch_action.isChecked(),
+            "standing_report": self.standing_action.isChecked(),
+            "summary_only": self.summary_only_action.isChecked(),
+            "render_cache": self.render_cache_action.isChecked(),
+            "category_rules": self.rules_path,
+            "trace": self.trace_action.isChecked(),
             "tutorial_shown": True
 
         }
@@ -293,6 +596,20 @@ class ExpenseSorterGUI(QMainWindow):
             print("Failed to load preferences:",e)
             pass
 
+    def clear_cache(self):
+        folder = self.folder_input.text()
+        if not folder:
+            self.log_output.append("\u274C Input folder is required.")
+            return
+        try:
+            # Parsed statements, the category cube and rendered periods all live in the folder's cache directory
+            cache_dir = default_cache_dir(folder)
+            if os.path.isdir(cache_dir):
+                shutil.rmtree(cache_dir)
+            self.log_output.append("\U0001F5D1\uFE0F Statement cache cleared.")
+        except Exception as e:
+            self.log_output.append(f"\u274C Error: {str(e)}")
+
     def show_help(self):
         help_dialog = HelpDialog(self)
         help_dialog.exec_()
@@ -334,6 +651,8 @@ class ExpenseSorterGUI(QMainWindow):
         folder = QFileDialog.getExistingDirectory(self, "Select Input Folder")
         if folder:
             self.folder_input.setText(folder)
+            self.load_preview()
+            self.update_watch()
 
     def browse_output_file(self):
         file_path, _ = QFileDialog.getSaveFileName(
@@ -345,7 +664,144 @@ class ExpenseSorterGUI(QMainWindow):
         if file_path:
             self.output_input.setText(file_path)
 
-    def run_script(self):
+    def browse_rules_file(self):
+        file_path, _ = QFileDialog.getOpenFileName(self, "Select Categorization Rules", "", "JSON Files (*.json);;All Files (*)")
+        if file_path:
+            self.rules_path = file_path
+            self.log_output.append(f"\U0001F3F7\uFE0F Categorization rules: {file_path}")
+            self.load_preview()
+            self.update_watch()
+
+    def clear_rules_file(self):
+        self.rules_path = ""
+        self.log_output.append("\U0001F3F7\uFE0F Categorization rules cleared.")
+        self.load_preview()
+        self.update_watch()
+
+    def warm_up(self):
+        self.startup.mark("first event loop pass")
+        self.module_warmer = ModuleWarmer()
+        self.module_warmer.finished.connect(self.warmed_up)
+        threading.Thread(target=self.module_warmer.run, name="expense-wizard-warm-up", daemon=True).start()
+
+    def warmed_up(self):
+        self.startup.mark("background imports")
+        self.warmed = True
+        # Both need the report pipeline, so they wait for it rather than import it on the GUI thread
+        self.load_preview()
+        self.update_watch()
+        self.watch_action.toggled.connect(self.update_watch)
+
+    def update_watch(self):
+        # Restarts the watcher for the current folder and rules, or stops it when watching is off.
+        # warmed_up starts it once the report pipeline is imported
+        if not self.warmed:
+            return
+        from folder_watch import FolderWatchService
+        if self.watch_service:
+            self.watch_service.stop()
+            self.watch_service = None
+        folder = self.folder_input.text()
+        if not self.watch_action.isChecked() or not folder or not os.path.isdir(folder):
+            return
+        self.watch_service = FolderWatchService(
+            folder, store_path=default_store_path(folder) if self.store_action.isChecked() else None,
+            rules_loader=partial(self.rules.load_quietly, self.rules_path), log=self.watch_signals.log.emit, on_ingested=self.watch_signals.ingested.emit,
+            lock=self.cache_lock)
+        self.watch_service.start()
+
+    def watch_ingested(self, cube):
+        # New statements were parsed in the background; the preview picks up their totals directly
+        from summary_preview import SummaryPreview
+        self.preview = SummaryPreview(cube)
+        self.refresh_preview()
+        if not self.standing_action.isChecked() or self.closing or not self.output_input.text():
+            return
+        if self.job_thread or self.run_pending:
+            self.standing_pending = True
+        else:
+            self.run_script(standing=True)
+
+    def load_preview(self):
+        # Loads the folder's daily category totals in the background; the statement cache is shared
+        # with reports, so only one of the two runs at a time
+        if self.closing:
+            return
+        if self.job_thread or self.preview_thread:
+            self.preview_stale = True
+            return
+        self.preview_stale = False
+        self.preview = None
+        self.preview_tree.clear()
+        folder = self.folder_input.text()
+        if not folder or not os.path.isdir(folder):
+            self.preview_status.setText("Select an input folder to preview totals.")
+            return
+
+        self.preview_status.setText("\u23F3 Loading totals for the preview...")
+        self.preview_loader = PreviewLoader(folder, self.rules, self.rules_path, self.cache_lock)
+        self.preview_thread = QThread()
+        self.preview_loader.moveToThread(self.preview_thread)
+        self.preview_thread.started.connect(self.preview_loader.run)
+        self.preview_loader.loaded.connect(self.preview_loaded)
+        self.preview_loader.failed.connect(self.preview_failed)
+        for signal in (self.preview_loader.loaded, self.preview_loader.failed):
+            signal.connect(self.preview_thread.quit)
+        self.preview_thread.finished.connect(self.preview_cleanup)
+        self.preview_thread.start()
+
+    def preview_loaded(self, preview):
+        self.preview = preview
+        self.refresh_preview()
+
+    def preview_failed(self, message):
+        self.preview_status.setText(f"\u274C Preview: {message}")
+
+    def preview_cleanup(self):
+        self.preview_loader.deleteLater()
+        self.preview_thread.deleteLater()
+        self.preview_loader = None
+        self.preview_thread = None
+        if self.run_pending:
+            standing = self.run_pending == "standing"
+            self.run_pending = False
+            self.run_script(standing=standing)
+        elif self.preview_stale:
+            self.load_preview()
+
+    def schedule_preview(self):
+        # Restarting the timer on every edit means only the last of a burst of changes is computed
+        self.preview_timer.start()
+
+    def refresh_preview(self):
+        if not self.preview:
+            return
+        start_date = self.start_date.date().toPyDate()
+        end_date = self.end_date.date().toPyDate()
+        try:
+            result = self.preview.query(start_date, end_date, self.grouping.currentText())
+        except ValueError as e:
+            self.preview_status.setText(f"\u274C {e}")
+            return
+
+        self.preview_tree.clear()
+        total = result["total"]
+        if not total:
+            self.preview_status.setText("No transactions in the selected date range.")
+            return
+        self.preview_status.setText(
+            f"Expenses {total['expenses']:,.2f} \u2022 Payments {total['payments']:,.2f} \u2022 "
+            f"Difference {total['net']:,.2f} \u2022 {total['count']} transactions")
+        items = []
+        for row in [total] + result["periods"]:
+            item = QTreeWidgetItem([row["label"], f"{row['net']:,.2f}", str(row["count"])])
+            for category, amount, count in row["categories"]:
+                QTreeWidgetItem(item, [category, f"{amount:,.2f}", str(count)])
+            items.append(item)
+        self.preview_tree.addTopLevelItems(items)
+        items[0].setExpanded(True)
+
+    def run_script(self, standing=False):
         folder = self.folder_input.text()
         out_folder = self.output_input.text()
         start_date = self.start_date.date().toPyDate()
@@ -353,12 +809,23 @@ class ExpenseSorterGUI(QMainWindow):
         group_mode = self.grouping.currentText()
         file_format = self.export_format_action.currentText() or ""
         use_csv = "csv" in file_format.lower()
+        csv_archive = "zip" in file_format.lower()
+        columnar_format = next((name for name in ("parquet", "arrow") if name in file_format.lower()), None)
         chart_type = self.chart_type_action.currentText()
+        # A standing report is brought up to date in place, re-rendering only the periods that changed.
+        # Parquet and Arrow datasets are always written in full
+        incremental = (self.incremental_action.isChecked() or standing) and not columnar_format
 
 
 
         self.log_output.clear()
 
+        if self.preview_thread:
+            # Reports and the preview share the statement cache; start once the preview has loaded
+            self.run_pending = "standing" if standing else "report"
+            self.log_output.append("\u23F3 Waiting for the preview to finish loading...")
+            return
+
         if not folder:
             self.log_output.append("\u274C Input folder is required.")
             return
@@ -367,6 +834,10 @@ class ExpenseSorterGUI(QMainWindow):
             self.log_output.append("\u274C Output file path is required.")
             return
 
+        if standing and (csv_archive or columnar_format):
+            self.log_output.append(f"\u274C {file_format} exports cannot be kept up to date; choose Excel or CSV.")
+            return
+
         self.log_output.append(f"\U0001F4C2 Input: {folder}")
         self.log_output.append(f"\U0001F4BE Output: {out_folder}")
         self.log_output.append(
@@ -375,20 +846,110 @@ class ExpenseSorterGUI(QMainWindow):
 
         self.log_output.append("\u2699\uFE0F Running script...")
 
-        try:
-
-            path = main_processing_function(folder, start_date, end_date, out_folder, group_mode,use_csv, chart_type=chart_type)
-
-            self.log_output.append(f"\u2705 Report saved to: {path}")
-            self.save_preferences()
-        except Exception as e:
-            self.log_output.append(f"\u274C Error: {str(e)}")
-            self.log_output.append(traceback.format_exc())
+        self.job = ReportJob(folder_path=folder, start_date=start_date, end_date=end_date, output_folder=out_folder,
+                             group_mode=group_mode, use_csv=use_csv, chart_type=chart_type, csv_archive=csv_archive,
+                             incremental=incremental,
+                             store_path=default_store_path(folder) if self.store_action.isChecked() else None,
+                             compact=self.compact_action.isChecked(),
+                             streaming=self.stream_action.isChecked() and not incremental,
+                             period_workers=os.cpu_count() if self.parallel_render_action.isChecked() else None,
+                             workbook_per_period=self.split_workbook_action.isChecked() and not use_csv and not incremental
+                             and not columnar_format,
+                             rules=self.rules, rules_path=self.rules_path,
+                             summary_only=self.summary_only_action.isChecked() and not incremental and not columnar_format,
+                             render_cache_dir=default_render_cache_dir(default_cache_dir(folder))
+                             if self.render_cache_action.isChecked() else None,
+                             columnar_format=columnar_format,
+                             trace=ReportTrace() if self.trace_action.isChecked() else None,
+                             lock=self.cache_lock)
+        self.job_thread = QThread()
+        self.job.moveToThread(self.job_thread)
+        self.job_thread.started.connect(self.job.run)
+        self.job.log.connect(self.log_output.append)
+        self.job.progress.connect(self.show_progress)
+        self.job.finished.connect(self.job_finished)
+        self.job.failed.connect(self.job_failed)
+        self.job.cancelled.connect(self.job_cancelled)
+        for signal in (self.job.finished, self.job.failed, self.job.cancelled):
+            signal.connect(self.job_thread.quit)
+        self.job_thread.finished.connect(self.job_cleanup)
+
+        self.run_button.setEnabled(False)
+        self.cancel_button.setEnabled(True)
+        self.job_thread.start()
+
+    def show_progress(self, stage, done, total):
+        label = {"parse": "Statements parsed", "render": "Periods rendered"}.get(stage, stage)
+        self.log_output.append(f"\u23F3 {label}: {done}/{total}")
+
+    def cancel_job(self):
+        if self.job:
+            self.cancel_button.setEnabled(False)
+            self.log_output.append("\u23F9\uFE0F Cancelling...")
+            self.job.cancel()
+
+    def job_finished(self, path):
+        self.log_output.append(f"\u2705 Report saved to: {path}")
+        self.save_preferences()
+
+    def job_failed(self, message, details):
+        self.log_output.append(f"\u274C Error: {message}")
+        if details:
+            self.log_output.append(details)
+
+    def job_cancelled(self):
+        self.log_output.append("\u23F9\uFE0F Report cancelled.")
+
+    def job_cleanup(self):
+        self.job.deleteLater()
+        self.job_thread.deleteLater()
+        self.job = None
+        self.job_thread = None
+        self.run_button.setEnabled(True)
+        self.cancel_button.setEnabled(False)
+        if self.standing_pending and self.standing_action.isChecked() and self.output_input.text():
+            # Statements arrived during the run; the update reloads the preview when it finishes
+            self.standing_pending = False
+            self.run_script(standing=True)
+            if self.job_thread:
+                return
+        self.standing_pending = False
+        # The report may have parsed new statements, so the preview is reloaded from the refreshed cache
+        self.load_preview()
+
+    def closeEvent(self, event):
+        # The cleanup slots would otherwise start a pending report or preview after the wait below,
+        # on a loader Qt is about to delete
+        self.closing = True
+        self.preview_stale = False
+        self.run_pending = False
+        self.standing_pending = False
+        self.preview_timer.stop()
+        if self.job_thread:
+            self.job_thread.finished.disconnect(self.job_cleanup)
+            self.job.cancel()
+            self.job_thread.quit()
+            self.job_thread.wait()
+        if self.preview_thread:
+            self.preview_thread.finished.disconnect(self.preview_cleanup)
+            self.preview_loader.cancel()
+            self.preview_thread.quit()
+            self.preview_thread.wait()
+        if self.watch_service:
+            self.watch_service.stop()
+        super().closeEvent(event)
 
 def main():
+    # Needed for the statement parsing pool in the frozen executable
+    multiprocessing.freeze_support()
+    startup = StartupTimer("--debug-startup" in sys.argv)
+    startup.mark("imports")
     app = QApplication(sys.argv)
-    window = ExpenseSorterGUI()
+    startup.mark("QApplication")
+    window = ExpenseSorterGUI(startup)
+    startup.mark("main window")
     window.show()
+    startup.mark("show")
     sys.exit(app.exec_())
 
 if __name__ == "__main__":
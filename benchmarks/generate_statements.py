@@ -0,0 +1,91 @@
+import os
+import sys
+import random
+import argparse
+from datetime import date, timedelta
+from openpyxl import Workbook
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from statement_formats import STATEMENT_COLUMNS
+
+
+# Category -> (merchants, low amount, high amount), loosely shaped like a real Discover account
+MERCHANTS = {
+    "Merchandise": (["AMAZON MKTPLACE PMTS", "TARGET 00012345", "BEST BUY #1234", "JEWELRY SUPPLY CO", "RIO GRANDE"], 5, 900),
+    "Restaurants": (["STARBUCKS STORE #44", "CHIPOTLE ONLINE", "OLIVE GARDEN 1021", "PANERA BREAD #601"], 4, 120),
+    "Supermarkets": (["KROGER #512", "WHOLE FOODS MKT", "TRADER JOE'S #5", "SAFEWAY 1432"], 10, 300),
+    "Gasoline": (["SHELL OIL 57444", "EXXONMOBIL 4501", "BP#9528361", "COSTCO GAS #0109"], 15, 110),
+    "Services": (["COMCAST CABLE", "VERIZON WRLS", "ADOBE *CREATIVE CLD", "QUICKBOOKS ONLINE"], 10, 400),
+    "Travel/ Entertainment": (["DELTA AIR 0062", "MARRIOTT HOTELS", "UBER *TRIP", "AMC THEATRES"], 12, 1500),
+    "Home Improvement": (["THE HOME DEPOT #0612", "LOWE'S #1180"], 8, 700),
+    "Awards and Rebate Credits": (["CASHBACK BONUS REDEMPTION"], -50, -1),
+    "Payments and Credits": (["INTERNET PAYMENT - THANK YOU", "DIRECTPAY FULL BALANCE", "RETURN CREDIT"], -3000, -20),
+}
+WEIGHTS = [30, 18, 14, 10, 8, 5, 5, 2, 8]
+# Discover's .xlsx export has 11 rows of account details above the header
+PREAMBLE_ROWS = 11
+
+
+def statement_rows(rng, period_start, period_end, count):
+    categories = list(MERCHANTS)
+    span = (period_end - period_start).days
+    for _ in range(count):
+        category = rng.choices(categories, WEIGHTS)[0]
+        merchants, low, high = MERCHANTS[category]
+        trans_date = period_start + timedelta(days=rng.randint(0, span))
+        # Most charges post a day or two later; a few have no post date yet
+        post_date = None if rng.random() < 0.03 else trans_date + timedelta(days=rng.randint(0, 3))
+        yield [
+            trans_date.strftime("%m/%d/%Y"),
+            post_date.strftime("%m/%d/%Y") if post_date else None,
+            rng.choice(merchants),
+            round(rng.uniform(low, high), 2),
+            category,
+        ]
+
+
+def write_statement(path, rows, period_start, period_end):
+    # Write-only keeps memory flat for statements with hundreds of thousands of rows
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Discover")
+    ws.append(["Discover Card Account Activity"])
+    ws.append([f"Statement period {period_start.strftime('%m/%d/%Y')} - {period_end.strftime('%m/%d/%Y')}"])
+    for _ in range(PREAMBLE_ROWS - 2):
+        ws.append([])
+    ws.append(STATEMENT_COLUMNS)
+    for row in rows:
+        ws.append(row)
+    wb.save(path)
+
+
+def generate_statements(folder, files=3, rows_per_file=300, start=date(2023, 1, 1), seed=1):
+    # One statement per month starting at start; returns the written paths
+    rng = random.Random(seed)
+    os.makedirs(folder, exist_ok=True)
+    paths = []
+    period_start = start
+    for i in range(files):
+        next_start = (period_start.replace(day=1) + timedelta(days=32)).replace(day=1)
+        period_end = next_start - timedelta(days=1)
+        path = os.path.join(folder, f"Discover-Statement-{period_start.strftime('%Y%m')}-{i:04d}.xlsx")
+        write_statement(path, statement_rows(rng, period_start, period_end, rows_per_file), period_start, period_end)
+        paths.append(path)
+        period_start = next_start
+    return paths
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write synthetic Discover-format statements for benchmarking.")
+    parser.add_argument("folder", help="Folder to write the statements to")
+    parser.add_argument("--files", type=int, default=12, help="Number of monthly statements")
+    parser.add_argument("--rows", type=int, default=300, help="Transactions per statement")
+    parser.add_argument("--start", default="2023-01-01", help="First statement month (YYYY-MM-DD)")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    paths = generate_statements(args.folder, args.files, args.rows, date.fromisoformat(args.start), args.seed)
+    print(f"Wrote {len(paths)} statements with {args.files * args.rows} transactions to {args.folder}")
+
+
+if __name__ == "__main__":
+    main()
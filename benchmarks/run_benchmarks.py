@@ -0,0 +1,233 @@
+import os
+import sys
+import json
+import time
+import shutil
+import platform
+import argparse
+import tempfile
+import statistics
+import subprocess
+from datetime import datetime, date
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import pandas as pd
+import openpyxl
+from openpyxl import Workbook
+import expense_sorter as es
+from generate_statements import generate_statements
+
+
+RESULTS_VERSION = 1
+GROUP_MODES = ["Weekly", "Biweekly", "Monthly"]
+CHART_HELPERS = {
+    "Pie": es.add_pie_chart,
+    "Bar": es.add_bar_chart,
+    "Column": es.add_column_chart,
+    "Doughnut": es.add_doughnut_chart,
+    "Radar": es.add_radar_chart,
+}
+# name -> (files, rows per file)
+SIZES = {
+    "small": (3, 300),
+    "medium": (24, 5000),
+    "large": (240, 5000),
+}
+
+
+def timed(func, repeat):
+    # Returns (last result, seconds per run)
+    samples = []
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        samples.append(time.perf_counter() - started)
+    return result, samples
+
+
+def record(results, stage, samples, group_mode=None, **extra):
+    entry = {
+        "stage": stage,
+        "group_mode": group_mode,
+        "seconds": min(samples),
+        "median": statistics.median(samples),
+        "samples": samples,
+    }
+    entry.update(extra)
+    results.append(entry)
+    label = f"{stage} [{group_mode}]" if group_mode else stage
+    print(f"{label:<36} {entry['seconds']:9.4f}s")
+
+
+def render_sheets(period_groups, group_mode):
+    wb = Workbook(write_only=True)
+    for i, start, end, period_df in period_groups:
+        es.write_period_sheets(period_df, es.excel_period_suffix(i, start, end, group_mode), wb, "Pie")
+    return wb
+
+
+def build_summary_sheets(period_groups):
+    # The two-column category/total table the chart helpers point at, one sheet per period
+    wb = Workbook()
+    sheets = []
+    for _, _, _, period_df in period_groups:
+        ws = wb.create_sheet()
+        ws.append(["Category", "Total Amount"])
+        totals = period_df.groupby("Category")["Amount"].sum()
+        for category, total in totals.items():
+            ws.append([category, total])
+        sheets.append((ws, len(totals)))
+    return sheets
+
+
+def add_charts(sheets, helper):
+    for ws, rows in sheets:
+        if rows:
+            helper(ws, 2, 1 + rows)
+
+
+def write_csvs(period_groups, folder, group_mode):
+    for i, start, end, period_df in period_groups:
+        path = os.path.join(folder, f"{es.csv_period_suffix(i, start, end, group_mode)}.csv")
+        with open(path, "w", encoding="utf-8", newline="", buffering=es.CSV_BUFFER_SIZE) as f:
+            es.write_period_csv(period_df, f)
+
+
+def run_suite(data_folder, repeat=3, workers=None, group_modes=GROUP_MODES, scratch=None, compact=False):
+    results = []
+    file_list = es.list_statement_files(data_folder)
+    paths = [os.path.join(data_folder, file) for file in file_list]
+
+    dataframes, samples = timed(lambda: es.parse_statements(paths, workers, compact=compact), repeat)
+    record(results, "ingest", samples, files=len(paths), rows=sum(len(df) for df in dataframes))
+
+    def clean():
+        df = es.concat_statements(dataframes)
+        return df[df["Trans. date"].notna()]
+    df, samples = timed(clean, repeat)
+    record(results, "clean", samples, rows=len(df))
+
+    start_date = df["Trans. date"].min().normalize()
+    end_date = df["Trans. date"].max().normalize()
+
+    for group_mode in group_modes:
+        def bucket():
+            periods = es.build_periods(start_date, end_date, group_mode)
+            return list(es.group_by_period(df, periods))
+        period_groups, samples = timed(bucket, repeat)
+        record(results, "bucket", samples, group_mode, periods=len(period_groups))
+
+        samples = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            wb = render_sheets(period_groups, group_mode)
+            samples.append(time.perf_counter() - started)
+            sheet_count = len(wb.worksheets)
+            # Unsaved write-only sheets hold open temp files
+            es.discard_workbook(wb)
+        record(results, "write_period_sheets", samples, group_mode, periods=len(period_groups), sheets=sheet_count)
+
+        output_path = os.path.join(scratch, f"{group_mode}.xlsx")
+        _, samples = timed(lambda: render_sheets(period_groups, group_mode).save(output_path), repeat)
+        record(results, "excel_report", samples, group_mode, bytes=os.path.getsize(output_path))
+
+        for chart_type, helper in CHART_HELPERS.items():
+            samples = []
+            for _ in range(repeat):
+                sheets = build_summary_sheets(period_groups)
+                started = time.perf_counter()
+                add_charts(sheets, helper)
+                samples.append(time.perf_counter() - started)
+            record(results, f"chart_{chart_type.lower()}", samples, group_mode, charts=len(sheets))
+
+        csv_folder = os.path.join(scratch, f"{group_mode}_csv")
+        os.makedirs(csv_folder, exist_ok=True)
+        _, samples = timed(lambda: write_csvs(period_groups, csv_folder, group_mode), repeat)
+        record(results, "csv", samples, group_mode, files=len(period_groups))
+
+    return results
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare_results(previous_path, results):
+    # Prints current / previous for every stage both runs measured
+    with open(previous_path, "r") as f:
+        previous = json.load(f)
+    before = {(r["stage"], r["group_mode"]): r["seconds"] for r in previous.get("results", [])}
+    print(f"\nCompared with {previous_path} ({previous.get('revision') or 'unknown revision'})")
+    for entry in results:
+        key = (entry["stage"], entry["group_mode"])
+        if key in before and before[key] > 0:
+            label = f"{key[0]} [{key[1]}]" if key[1] else key[0]
+            print(f"{label:<36} {entry['seconds'] / before[key]:8.2f}x")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time every stage of the expense report pipeline.")
+    parser.add_argument("--data", help="Folder of Discover statements to benchmark (generated when omitted)")
+    parser.add_argument("--size", choices=list(SIZES), default="small", help="Preset for generated data")
+    parser.add_argument("--files", type=int, help="Generated statements (overrides --size)")
+    parser.add_argument("--rows", type=int, help="Transactions per generated statement (overrides --size)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per stage; the fastest is reported")
+    parser.add_argument("--workers", type=int, help="Processes used to parse statements")
+    parser.add_argument("--group-mode", action="append", choices=GROUP_MODES, help="Only benchmark these group modes")
+    parser.add_argument("--compact", action="store_true", help="Benchmark the compact memory mode")
+    parser.add_argument("--output", default="benchmark_results.json", help="Where to write the JSON results")
+    parser.add_argument("--compare", help="Earlier results file to compare against")
+    args = parser.parse_args(argv)
+
+    scratch = tempfile.mkdtemp(prefix="expense_wizard_bench_")
+    try:
+        if args.data:
+            data_folder = args.data
+            dataset = {"folder": os.path.abspath(args.data)}
+        else:
+            files, rows = SIZES[args.size]
+            files = args.files or files
+            rows = args.rows or rows
+            data_folder = os.path.join(scratch, "statements")
+            started = time.perf_counter()
+            generate_statements(data_folder, files, rows, date(2023, 1, 1), args.seed)
+            print(f"Generated {files} statements x {rows} rows in {time.perf_counter() - started:.1f}s")
+            dataset = {"files": files, "rows_per_file": rows, "seed": args.seed}
+
+        results = run_suite(data_folder, args.repeat, args.workers, args.group_mode or GROUP_MODES, scratch, args.compact)
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+    report = {
+        "version": RESULTS_VERSION,
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "openpyxl": openpyxl.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "repeat": args.repeat,
+        "dataset": dataset,
+        "compact": args.compact,
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=1)
+    print(f"\nWrote {args.output}")
+
+    if args.compare:
+        compare_results(args.compare, results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+import os
+import hashlib
+import json
+import numpy as np
+import pandas as pd
+
+
+CUBE_VERSION = 2
+# Kept in the statement cache folder, so clearing the cache clears the cube too. Plain arrays and JSON,
+# never pickle, so reading a cube cannot run code
+CUBE_FILENAME = "category_cube.npz"
+PAYMENT_PATTERN = "payment|credit"
+
+
+def is_payment_category(categories):
+    # Summary sheets count these as card payments rather than expenses
+    return np.asarray(pd.Index(categories, dtype=object).str.lower().str.contains(PAYMENT_PATTERN, regex=True), dtype=bool)
+
+
+def cube_key(sources, deduplicate=True, rules=None):
+    # Changes whenever a statement, the duplicate handling or the categorization rules change
+    text = json.dumps({"version": CUBE_VERSION, "sources": sources, "deduplicate": deduplicate, "rules": rules},
+                      sort_keys=True)
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+class CategoryCube:
+    # Day x category totals in integer cents, held as running sums down the days: row d is the total of
+    # every day before first_day + d. The totals of any date range are then one subtraction per category,
+    # and regrouping into weeks or months never touches a transaction row
+    def __init__(self, first_day, categories, cents, counts, key=None):
+        self.first_day = pd.Timestamp(first_day)
+        self.categories = pd.Index(categories, dtype=object)
+        self.is_payment = is_payment_category(self.categories)
+        self.cents = cents
+        self.counts = counts
+        self.key = key
+
+    @classmethod
+    def from_frame(cls, df, key=None):
+        # Rows without a date or a category never reach a report, so they are left out
+        dates = pd.to_datetime(df["Trans. date"]).dt.normalize()
+        categories = df["Category"].astype(object) if isinstance(df["Category"].dtype, pd.CategoricalDtype) \
+            else df["Category"]
+        keep = dates.notna().to_numpy() & categories.notna().to_numpy()
+        if not keep.any():
+            return cls(pd.Timestamp(0), [], np.zeros((1, 0), dtype="int64"), np.zeros((1, 0), dtype="int64"), key)
+        dates = dates[keep]
+        codes, values = pd.factorize(categories[keep])
+
+        amounts = df["Amount"][keep]
+        if pd.api.types.is_integer_dtype(amounts):
+            # Compact frames already hold cents
+            cents = amounts.to_numpy(dtype="int64")
+        else:
+            cents = np.rint(amounts.fillna(0).to_numpy(dtype="float64") * 100).astype("int64")
+
+        first_day = dates.min()
+        days = ((dates - first_day).dt.days).to_numpy(dtype="int64")
+        span = int(days.max()) + 1
+        cells = days * len(values) + codes
+        shape = (span, len(values))
+
+        daily_cents = np.zeros(span * len(values), dtype="int64")
+        np.add.at(daily_cents, cells, cents)
+        daily_counts = np.bincount(cells, minlength=span * len(values)).astype("int64")
+        return cls(first_day, values, running_sums(daily_cents.reshape(shape)), running_sums(daily_counts.reshape(shape)),
+                   key)
+
+    @property
+    def days(self):
+        return len(self.cents) - 1
+
+    def day_bounds(self, start, end):
+        # Running-sum rows bracketing start..end, both inclusive and clipped to the days the cube covers
+        lower = (pd.Timestamp(start).normalize() - self.first_day).days
+        upper = (pd.Timestamp(end).normalize() - self.first_day).days + 1
+        return min(max(lower, 0), self.days), min(max(upper, 0), self.days)
+
+    def totals(self, start, end):
+        # Cents and transaction count per category with charges between start and end
+        lower, upper = self.day_bounds(start, end)
+        counts = self.counts[upper] - self.counts[lower]
+        present = counts > 0
+        return pd.DataFrame({"cents": self.cents[upper][present] - self.cents[lower][present], "count": counts[present]},
+                            index=self.categories[present])
+
+    def split(self, start, end):
+        # (payments, expenses) in cents between start and end
+        lower, upper = self.day_bounds(start, end)
+        cents = self.cents[upper] - self.cents[lower]
+        return int(cents[self.is_payment].sum()), int(cents[~self.is_payment].sum())
+
+    def period_totals(self, periods):
+        # (cents, counts), each periods x categories, from one gather over the running sums
+        first_day = np.datetime64(self.first_day.normalize(), "D")
+        starts = pd.DatetimeIndex([start for start, _ in periods]).values.astype("datetime64[D]")
+        ends = pd.DatetimeIndex([end for _, end in periods]).values.astype("datetime64[D]")
+        lower = np.clip((starts - first_day).astype("int64"), 0, self.days)
+        upper = np.clip((ends - first_day).astype("int64") + 1, 0, self.days)
+        return self.cents[upper] - self.cents[lower], self.counts[upper] - self.counts[lower]
+
+    def regroup(self, periods):
+        # (i, start, end, totals) for every period with transactions, numbered like group_by_period
+        for label, (start, end) in enumerate(periods):
+            lower, upper = self.day_bounds(start, end)
+            if lower >= upper:
+                continue
+            totals = self.totals(start, end)
+            if not totals.empty:
+                yield label + 1, start, end, totals
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        meta = json.dumps({"version": CUBE_VERSION, "key": self.key, "first_day": self.first_day.strftime("%Y-%m-%d"),
+                           "categories": [str(category) for category in self.categories]})
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez(f, meta=np.array(meta), cents=self.cents, counts=self.counts)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path, key=None):
+        # None when there is no cube, it is unreadable, or it was built from different statements
+        try:
+            with np.load(path, allow_pickle=False) as saved:
+                meta = json.loads(str(saved["meta"]))
+                cents, counts = saved["cents"], saved["counts"]
+        except Exception:
+            return None
+        if not isinstance(meta, dict) or meta.get("version") != CUBE_VERSION or (key and meta.get("key") != key):
+            return None
+        if cents.dtype != np.int64 or cents.shape != counts.shape or cents.shape[1:] != (len(meta["categories"]),):
+            return None
+        return cls(meta["first_day"], meta["categories"], cents, counts, meta["key"])
+
+
+def running_sums(daily):
+    # A leading row of zeros so a range starting on the first day needs no special case
+    sums = np.zeros((daily.shape[0] + 1, daily.shape[1]), dtype="int64")
+    np.cumsum(daily, axis=0, out=sums[1:])
+    return sums
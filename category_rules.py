@@ -0,0 +1,240 @@
+import re
+import json
+import hashlib
+import numpy as np
+import pandas as pd
+
+
+RULE_KINDS = ("keyword", "prefix", "regex")
+# Resolved (description, category) pairs kept between reports before the memo starts over
+MEMO_LIMIT = 1000000
+
+
+class KeywordMatcher:
+    # Aho-Corasick automaton: every keyword occurring in a text is found in one pass over it,
+    # however many keywords there are. Keywords are matched lower-cased
+    def __init__(self):
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [[]]
+
+    def add(self, keyword, value):
+        state = 0
+        for char in keyword:
+            following = self.goto[state].get(char)
+            if following is None:
+                following = len(self.goto)
+                self.goto[state][char] = following
+                self.goto.append({})
+                self.fail.append(0)
+                self.output.append([])
+            state = following
+        self.output[state].append((len(keyword), value))
+
+    def build(self):
+        # Breadth-first, so every failure link points at a state that is already complete
+        queue = list(self.goto[0].values())
+        for state in queue:
+            for char, following in self.goto[state].items():
+                queue.append(following)
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[following] = self.goto[fallback].get(char, 0)
+                self.output[following] = self.output[following] + self.output[self.fail[following]]
+
+    def find(self, text):
+        # Yields (start, value) for every occurrence
+        goto, fail, output = self.goto, self.fail, self.output
+        state = 0
+        for end, char in enumerate(text, 1):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for length, value in output[state]:
+                yield end - length, value
+
+
+class CategoryRules:
+    # User rules that re-file transactions by their description. Each rule is a dict with
+    # "pattern", "category", an optional "match" (keyword, prefix or regex; keyword by default) and an
+    # optional "categories" list limiting it to charges the issuer filed under those categories.
+    # Keywords and prefixes ignore case, as do regexes. The first rule in the list that matches wins
+    def __init__(self, rules):
+        # Stored with incremental reports, so editing the rules re-renders them
+        self.fingerprint = hashlib.sha1(json.dumps(rules, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+        self.rules = []
+        self.keywords = KeywordMatcher()
+        self.regexes = {}
+        unfiltered = []
+        for index, rule in enumerate(rules):
+            if not isinstance(rule, dict) or not rule.get("pattern") or not rule.get("category"):
+                raise ValueError(f"Rule {index + 1} needs a pattern and a category")
+            kind = rule.get("match", "keyword")
+            if kind not in RULE_KINDS:
+                raise ValueError(f"Rule {index + 1} has an unknown match type: {kind}")
+            limit = rule.get("categories")
+            if isinstance(limit, str):
+                limit = [limit]
+            limit = {str(category).strip().lower() for category in limit} if limit else None
+            pattern = str(rule["pattern"])
+            if kind == "regex":
+                try:
+                    regex = re.compile(pattern, re.I | re.S)
+                except re.error as e:
+                    raise ValueError(f"Rule {index + 1} has an invalid regex {pattern!r}: {e}")
+                literal = required_literal(pattern)
+                if literal:
+                    # Only tried on descriptions where the automaton saw its literal
+                    self.keywords.add(literal.lower(), -index - 1)
+                else:
+                    unfiltered.append(index)
+                self.regexes[index] = regex
+            else:
+                self.keywords.add(pattern.lower(), index)
+            self.rules.append((kind, str(rule["category"]), limit))
+        self.keywords.build()
+        self.unfiltered = unfiltered
+        self.memo = {}
+        self.candidate_memo = {}
+
+    def __len__(self):
+        return len(self.rules)
+
+    def allows(self, index, category):
+        limit = self.rules[index][2]
+        return limit is None or (category is not None and category.strip().lower() in limit)
+
+    def candidates(self, description):
+        # Rules that may match description, in rule order: keyword and prefix rules found by one automaton
+        # pass, and the regexes whose literal it saw. Kept per description, since a merchant shows up
+        # under several categories
+        if description not in self.candidate_memo:
+            if len(self.candidate_memo) >= MEMO_LIMIT:
+                self.candidate_memo.clear()
+            found = set(self.unfiltered)
+            for start, index in self.keywords.find(description.lower()):
+                if index < 0:
+                    found.add(-index - 1)
+                elif start == 0 or self.rules[index][0] == "keyword":
+                    found.add(index)
+            self.candidate_memo[description] = sorted(found)
+        return self.candidate_memo[description]
+
+    def match(self, description, category=None):
+        # Index of the first rule matching this charge, or None
+        for index in self.candidates(description):
+            if self.allows(index, category) and (index not in self.regexes or self.regexes[index].search(description)):
+                return index
+        return None
+
+    def resolve(self, description, category):
+        key = (description, category)
+        if key not in self.memo:
+            if len(self.memo) >= MEMO_LIMIT:
+                self.memo.clear()
+            index = None if description is None else self.match(description, category)
+            self.memo[key] = category if index is None else self.rules[index][1]
+        return self.memo[key]
+
+    def apply(self, df):
+        # Resolves each distinct (description, category) pair once and maps the result back over the column.
+        # Returns df itself when no rule changed anything
+        if df.empty or not self.rules:
+            return df
+        descriptions, description_values = factorize(df["Description"])
+        categories, category_values = factorize(df["Category"])
+        width = len(category_values) + 1
+        pairs, pair_values = pd.factorize(descriptions * width + categories + 1)
+
+        resolved = []
+        changed = False
+        for pair in pair_values:
+            description = description_values[pair // width] if pair // width >= 0 else None
+            category = category_values[pair % width - 1] if pair % width else None
+            result = self.resolve(description, category)
+            changed = changed or result != category
+            resolved.append(result)
+        if not changed:
+            return df
+
+        values = np.array(resolved, dtype=object)[pairs]
+        column = df["Category"]
+        if isinstance(column.dtype, pd.CategoricalDtype):
+            recategorized = pd.Series(pd.Categorical(values), index=df.index)
+        else:
+            recategorized = pd.Series(values, index=df.index).astype(column.dtype)
+        return df.assign(Category=recategorized)
+
+
+def factorize(column):
+    # (codes, distinct values); categoricals already carry both. Missing values get code -1
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        return column.cat.codes.to_numpy(dtype="int64"), [str(value) for value in column.cat.categories]
+    codes, values = pd.factorize(column)
+    return codes.astype("int64"), [str(value) for value in values]
+
+
+def required_literal(pattern):
+    # Longest run of plain characters every match of the regex must contain, or "" when there is no
+    # such run that is safe to pick out (alternation, inline flags, a quantifier that can drop it...)
+    if "|" in pattern or "(?" in pattern:
+        return ""
+    runs, run, depth, position = [], "", 0, 0
+    while position < len(pattern):
+        char = pattern[position]
+        position += 1
+        if char == "\\" and position < len(pattern):
+            escaped = pattern[position]
+            position += 1
+            if escaped in "xuUN" or escaped.isdigit():
+                # Character codes and backreferences
+                return ""
+            if escaped.isalnum():
+                # Classes such as \d and \b, or backreferences
+                runs.append(run)
+                run = ""
+                continue
+            char = escaped
+        elif char in "([":
+            runs.append(run)
+            run = ""
+            if char == "[":
+                # Skip the class; a ] right after [ or [^ belongs to it
+                position += pattern.startswith("^", position)
+                position += pattern.startswith("]", position)
+                while position < len(pattern) and pattern[position] != "]":
+                    position += 2 if pattern[position] == "\\" else 1
+                position += 1
+            else:
+                depth += 1
+            continue
+        elif char == ")":
+            depth -= 1
+            continue
+        elif char in ".^$":
+            runs.append(run)
+            run = ""
+            continue
+        elif char in "?*+{":
+            # The character before the quantifier may repeat or be left out
+            runs.append(run[:-1])
+            run = ""
+            if char == "{":
+                closing = pattern.find("}", position)
+                position = len(pattern) if closing < 0 else closing + 1
+            continue
+        if depth == 0:
+            run += char
+    runs.append(run)
+    return max(runs, key=len)
+
+
+def load_category_rules(path):
+    # A JSON list of rule dicts, e.g.
+    # [{"pattern": "RIO GRANDE", "category": "Supplier: Rio Grande", "categories": ["Merchandise"]}]
+    with open(path, "r", encoding="utf-8") as f:
+        rules = json.load(f)
+    if not isinstance(rules, list):
+        raise ValueError(f"{path} must contain a list of rules")
+    return CategoryRules(rules)
@@ -0,0 +1,115 @@
+import os
+import shutil
+import tempfile
+import numpy as np
+import pandas as pd
+from category_cube import is_payment_category
+from report_profiler import trace_stage
+
+
+# Parquet files, or Arrow IPC files that can be memory-mapped as they are
+COLUMNAR_FORMATS = ("parquet", "arrow")
+# Amounts are exact cents; 18 digits leave room for any total
+AMOUNT_PRECISION = 18
+AMOUNT_SCALE = 2
+
+
+def import_pyarrow():
+    # Only these exports need pyarrow, so it is not in requirements.txt
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise RuntimeError("Parquet and Arrow exports need pyarrow (pip install pyarrow).")
+    return pyarrow
+
+
+def amount_cents(amounts):
+    # (cents, valid) for a float dollar column, or a compact frame's integer cents
+    valid = amounts.notna().to_numpy()
+    if pd.api.types.is_integer_dtype(amounts):
+        return amounts.fillna(0).to_numpy(dtype="int64"), valid
+    return np.rint(amounts.fillna(0).to_numpy(dtype="float64") * 100).astype("int64"), valid
+
+
+def date_array(pa, column):
+    return pa.array(pd.to_datetime(column).to_numpy(dtype="datetime64[D]"), pa.date32(), from_pandas=True)
+
+
+def dictionary_array(pa, column):
+    # int32 indices in every file, whatever the period's number of distinct values, so the periods
+    # read back as one dataset
+    codes, values = pd.factorize(column)
+    indices = pa.array(codes.astype("int32"), pa.int32(), mask=codes < 0)
+    return pa.DictionaryArray.from_arrays(indices, pa.array([str(value) for value in values], pa.string()))
+
+
+def decimal_array(pa, cents, valid):
+    # A decimal128 value is its unscaled integer in 16 little-endian bytes, so whole columns of cents
+    # convert without a Python Decimal per row
+    words = np.empty((len(cents), 2), dtype="<i8")
+    words[:, 0] = cents
+    words[:, 1] = cents >> 63
+    validity = None if valid.all() else pa.py_buffer(np.packbits(valid, bitorder="little"))
+    return pa.Array.from_buffers(pa.decimal128(AMOUNT_PRECISION, AMOUNT_SCALE), len(cents), [validity, pa.py_buffer(words)])
+
+
+def transaction_table(pa, period_df):
+    period_df = period_df.sort_values(by="Trans. date", kind="stable")
+    cents, valid = amount_cents(period_df["Amount"])
+    return pa.table({
+        "Trans. date": date_array(pa, period_df["Trans. date"]),
+        "Post date": date_array(pa, period_df["Post date"]),
+        "Description": dictionary_array(pa, period_df["Description"]),
+        "Amount": decimal_array(pa, cents, valid),
+        "Category": dictionary_array(pa, period_df["Category"]),
+    })
+
+
+def summary_table(pa, period_df, end):
+    # One row per category, largest total first like the Summary sheet; Payment marks the rows the sheet
+    # counts as card payments rather than expenses
+    cents, _ = amount_cents(period_df["Amount"])
+    codes, values = pd.factorize(period_df["Category"])
+    keep = codes >= 0
+    totals = np.zeros(len(values), dtype="int64")
+    np.add.at(totals, codes[keep], cents[keep])
+    counts = np.bincount(codes[keep], minlength=len(values)).astype("int64")
+    order = np.argsort(-totals, kind="stable")
+    categories = pd.Series([str(value) for value in values], dtype=object).iloc[order]
+    return pa.table({
+        "Category": dictionary_array(pa, categories),
+        "Amount": decimal_array(pa, totals[order], np.ones(len(order), dtype=bool)),
+        "Transactions": pa.array(counts[order], pa.int64()),
+        "Payment": pa.array(is_payment_category(categories), pa.bool_()),
+        "Period end": pa.array(np.full(len(order), np.datetime64(end.date(), "D")), pa.date32()),
+    })
+
+
+def write_table(pa, table, path, extension):
+    if extension == "parquet":
+        pa.parquet.write_table(table, path)
+        return
+    with pa.ipc.new_file(path, table.schema) as writer:
+        writer.write_table(table)
+
+
+def write_columnar_report(period_groups, extension, output_path, trace=None):
+    # output_path becomes a folder with transactions/ and summary/ datasets, each holding one
+    # Period=YYYY-MM-DD folder per period (hive partitioning, as pyarrow.dataset, DuckDB or Spark expect).
+    # Nothing appears at output_path until every period is written
+    pa = import_pyarrow()
+    scratch = tempfile.mkdtemp(prefix=".columnar_", dir=os.path.dirname(os.path.abspath(output_path)))
+    try:
+        for i, start, end, period_df in period_groups:
+            with trace_stage(trace, "write_period_columnar", rows=len(period_df), files=2):
+                tables = {"transactions": transaction_table(pa, period_df), "summary": summary_table(pa, period_df, end)}
+                for name, table in tables.items():
+                    folder = os.path.join(scratch, name, f"Period={start.strftime('%Y-%m-%d')}")
+                    os.makedirs(folder)
+                    write_table(pa, table, os.path.join(folder, f"part-0.{extension}"), extension)
+    except Exception:
+        shutil.rmtree(scratch, ignore_errors=True)
+        raise
+    os.replace(scratch, output_path)
+    return output_path
@@ -0,0 +1,167 @@
+import sys
+import json
+import argparse
+import multiprocessing
+from expense_sorter import REPORT_FORMATS, run_report_jobs
+from report_paths import default_cache_dir, default_render_cache_dir, default_store_path
+from render_cache import RENDER_CACHE_MAX_BYTES, RenderCache
+from report_profiler import ReportTrace
+from category_rules import load_category_rules
+from folder_watch import FolderWatchService
+
+
+def parse_job(text):
+    # START,END[,GROUP[,FORMAT[,CHART]]] e.g. 2024-01-01,2024-03-31,Weekly,csv
+    fields = [field.strip() for field in text.split(",")]
+    if len(fields) < 2 or len(fields) > 5:
+        raise argparse.ArgumentTypeError(f"Expected START,END[,GROUP[,FORMAT[,CHART]]], got: {text}")
+    job = {"start_date": fields[0], "end_date": fields[1]}
+    for key, value in zip(["group_mode", "format", "chart_type"], fields[2:]):
+        if value:
+            job[key] = value
+    return job
+
+
+def load_jobs_file(path):
+    with open(path, "r") as f:
+        jobs = json.load(f)
+    if not isinstance(jobs, list):
+        raise ValueError(f"{path} must contain a list of jobs")
+    return jobs
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        description="Render several Expense Wizard reports from one load of the statement folder.")
+    parser.add_argument("folder", help="Folder containing the .xlsx, .csv, .ofx or .qfx statements")
+    parser.add_argument("--job", action="append", type=parse_job, default=[], metavar="START,END[,GROUP[,FORMAT[,CHART]]]",
+                        help=f"Report to render; GROUP defaults to Monthly, FORMAT ({', '.join(REPORT_FORMATS)}) to xlsx, "
+                             "CHART to Pie. Repeat for more reports")
+    parser.add_argument("--jobs-file", help="JSON list of jobs with start_date, end_date, group_mode, format, chart_type")
+    parser.add_argument("--output", help="Output folder (default: CleanStatements or CleanStatementsCSV in the input folder)")
+    parser.add_argument("--parallel", type=int, default=1, metavar="N", help="Render up to N reports at once")
+    parser.add_argument("--period-workers", type=int, metavar="N",
+                        help="Render the periods of each Excel report in N processes (ignored with --parallel)")
+    parser.add_argument("--workbook-per-period", action="store_true",
+                        help="Write each period of an Excel report as a workbook of its own")
+    parser.add_argument("--rules", metavar="PATH",
+                        help="JSON list of categorization rules applied to every transaction before rendering")
+    parser.add_argument("--summary-only", action="store_true",
+                        help="Write only the Summary sheets, from saved daily category totals instead of the transactions")
+    parser.add_argument("--workers", type=int, help="Processes used to parse statements")
+    parser.add_argument("--no-cache", action="store_true", help="Re-read every statement instead of using the cache")
+    parser.add_argument("--rebuild-cache", action="store_true", help="Re-parse every statement and refresh the cache")
+    parser.add_argument("--no-render-cache", action="store_true",
+                        help="Render every period instead of reusing periods rendered by earlier reports")
+    parser.add_argument("--render-cache-size", type=int, default=RENDER_CACHE_MAX_BYTES // (1024 * 1024), metavar="MB",
+                        help="Disk space kept for rendered periods before the least recently used are evicted (default: %(default)s)")
+    parser.add_argument("--store", action="store_true", help="Read transactions through the SQLite transaction store")
+    parser.add_argument("--keep-duplicates", action="store_true",
+                        help="Keep transactions repeated across overlapping statements")
+    parser.add_argument("--compact", action="store_true",
+                        help="Hold transactions as categoricals and integer cents to cut memory on large archives")
+    parser.add_argument("--stream", action="store_true",
+                        help="Read statements in chunks so memory stays flat for very large exports")
+    parser.add_argument("--chunk-size", type=int, metavar="ROWS", help="Rows per chunk when streaming")
+    parser.add_argument("--trace", metavar="PATH", help="Time every stage and write the trace as JSON to PATH")
+    parser.add_argument("--profile", metavar="PATH", help="Capture a cProfile of the run and write the stats to PATH")
+    parser.add_argument("--watch", action="store_true",
+                        help="Keep running: ingest statements as they land in the folder and keep each job's report "
+                             "up to date in place (xlsx or csv jobs; jobs are optional)")
+    parser.add_argument("--poll", action="store_true", help="With --watch, poll the folder instead of using inotify")
+    parser.add_argument("-q", "--quiet", action="store_true", help="Only print the output paths")
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    jobs = list(args.job)
+    if args.jobs_file:
+        try:
+            jobs += load_jobs_file(args.jobs_file)
+        except (OSError, ValueError) as e:
+            parser.error(str(e))
+    if not jobs and not args.watch:
+        parser.error("at least one --job or --jobs-file is required")
+    category_rules = None
+    if args.rules:
+        try:
+            category_rules = load_category_rules(args.rules)
+        except (OSError, ValueError) as e:
+            parser.error(str(e))
+
+    log = None if args.quiet else lambda message: print(message, file=sys.stderr)
+    if args.watch:
+        return watch(args, jobs, category_rules, log)
+    trace = ReportTrace(profile=bool(args.profile)) if args.trace or args.profile else None
+    try:
+        results = run_report_jobs(
+            args.folder, jobs,
+            output_folder=args.output,
+            render_workers=args.parallel,
+            use_cache=not args.no_cache,
+            rebuild_cache=args.rebuild_cache,
+            workers=args.workers,
+            log=log,
+            store_path=default_store_path(args.folder) if args.store else None,
+            deduplicate=not args.keep_duplicates,
+            trace=trace,
+            compact=args.compact,
+            streaming=args.stream,
+            chunk_size=args.chunk_size,
+            period_workers=args.period_workers,
+            workbook_per_period=args.workbook_per_period,
+            category_rules=category_rules,
+            summary_only=args.summary_only,
+            # Summary-only reports never render a period
+            render_cache=None if args.no_render_cache or args.summary_only else
+            RenderCache(default_render_cache_dir(default_cache_dir(args.folder)), args.render_cache_size * 1024 * 1024)
+        )
+    except (FileNotFoundError, ValueError, KeyError, RuntimeError) as e:
+        # RuntimeError: an optional dependency such as pyarrow is missing
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    if trace:
+        if log:
+            log(trace.summary())
+        if args.trace:
+            trace.save(args.trace)
+        if args.profile:
+            trace.save_profile(args.profile)
+
+    for result in results:
+        if result:
+            print(result)
+    # Non-zero when a job had nothing to render
+    return 0 if all(results) else 2
+
+
+def watch(args, jobs, category_rules, log):
+    try:
+        service = FolderWatchService(args.folder, jobs, args.output,
+                                     store_path=default_store_path(args.folder) if args.store else None,
+                                     category_rules=category_rules, workers=args.workers, log=log, polling=args.poll)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    service.start()
+    try:
+        # Until Ctrl+C; joined with a timeout so the interrupt is seen on Windows too
+        while service.thread.is_alive():
+            service.thread.join(1.0)
+    except KeyboardInterrupt:
+        return 0
+    finally:
+        service.stop()
+    # The service thread only ends by itself when it failed
+    print(f"Error: stopped watching: {service.error}", file=sys.stderr)
+    return 1
+
+
+if __name__ == "__main__":
+    # Needed for the parsing and rendering pools in the frozen executable
+    multiprocessing.freeze_support()
+    sys.exit(main())
@@ -1,43 +1,196 @@
 import pandas as pd
+import numpy as np
 import os
 import re
+import io
+import csv
+import time
+import shutil
+import zipfile
+import hashlib
+import tempfile
+import openpyxl
+from collections import deque
 from datetime import datetime
-from openpyxl.styles import Alignment, Font
-from openpyxl.utils import get_column_letter
+from contextlib import closing
+from functools import lru_cache
+from xml.sax.saxutils import escape
+from xml.etree import ElementTree
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pandas.api.types import union_categoricals
+from openpyxl import Workbook, load_workbook
+from openpyxl.styles import Alignment, Font, NamedStyle
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.utils import get_column_letter, quote_sheetname
 from openpyxl.chart import (PieChart, BarChart, DoughnutChart, RadarChart, Reference)
+from statement_cache import StatementCache, default_cache_dir, file_fingerprint
+from transaction_store import TransactionStore
+from report_manifest import ReportManifest, period_fingerprint, report_key
+from report_profiler import trace_stage
+from period_spill import PeriodSpill
+from columnar_export import COLUMNAR_FORMATS, import_pyarrow, write_columnar_report
+from category_cube import CUBE_FILENAME, CategoryCube, cube_key, is_payment_category
+from statement_formats import (STATEMENT_COLUMNS, STATEMENT_EXTENSIONS, STREAM_CHUNK_ROWS, detect_statement_format,
+                               iter_statement_chunks, read_statement)
 
 
+DEDUP_COLUMNS = ["Trans. date", "Post date", "Description", "Amount"]
+SHEET_TAG = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}sheet"
+
+# Below this many files the cost of starting worker processes outweighs the gain
+PARALLEL_MIN_FILES = 4
+# Same for periods rendered in parallel
+PARALLEL_MIN_PERIODS = 4
+
+CSV_BUFFER_SIZE = 1024 * 1024
+
+
+class ReportCancelled(Exception):
+    pass
+
+
+class NoTransactionsFound(ValueError):
+    pass
+
+
+def check_cancelled(cancel_event):
+    if cancel_event is not None and cancel_event.is_set():
+        raise ReportCancelled("Report generation was cancelled.")
+
+
+AMOUNT_FORMAT = '"$"#,##0.00'
+DATE_FORMAT = "YYYY-MM-DD HH:MM:SS"
+BOLD_FONT = Font(bold=True)
+
+
+def register_report_styles(wb):
+    # Shared named styles; cells reference them instead of carrying their own copies
+    if "Amount" not in wb.named_styles:
+        wb.add_named_style(NamedStyle(name="Amount", number_format=AMOUNT_FORMAT))
+    if "Report Date" not in wb.named_styles:
+        wb.add_named_style(NamedStyle(name="Report Date", number_format=DATE_FORMAT))
+
+
+def seed_report_styles(wb):
+    # Registers every cell style write_period_sheets uses, in a fixed order, so workbooks rendered
+    # in separate processes number their styles the same way and their sheets can be combined
+    register_report_styles(wb)
+    ws = wb.create_sheet()
+    title_cell = styled_cell(ws, None, font=BOLD_FONT)
+    title_cell.alignment = Alignment(horizontal='center')
+    cells = [title_cell, styled_cell(ws, None, font=BOLD_FONT)]
+    cells += [styled_cell(ws, None, "Amount", Font(bold=True, color=color)) for color in (None, "FF0000", "008000")]
+    # A date value also registers the default date format openpyxl assigns before the named style replaces it
+    cells += [styled_cell(ws, None, "Amount"), styled_cell(ws, datetime(2000, 1, 1), "Report Date")]
+    for cell in cells:
+        cell.style_id
+    wb.remove(ws)
+
+
+@lru_cache(maxsize=None)
+def report_style_fingerprint():
+    # Hash of the style table seed_report_styles produces under this openpyxl version. Period workbooks
+    # rendered under another one number their styles differently and cannot be stitched together
+    wb = Workbook(write_only=True)
+    seed_report_styles(wb)
+    buffer = io.BytesIO()
+    wb.save(buffer)
+    with zipfile.ZipFile(buffer) as archive:
+        styles = archive.read("xl/styles.xml")
+    return hashlib.sha1(openpyxl.__version__.encode("utf-8") + styles).hexdigest()
 
-def auto_adjust_column_widths(ws):
-    for col in ws.columns:
-        max_length = 0
-        col_letter = get_column_letter(col[0].column)
-        for cell in col:
-            try:
-                if cell.value is not None:
-                    display = f"${cell.value:,.2f}" if isinstance(cell.value, (int, float)) else str(cell.value)
-                    max_length = max(max_length, len(display))
-            except:
-                pass
-        ws.column_dimensions[col_letter].width = max_length + 2
-
-
-def format_amount_column(ws, column_letter):
-    for row in range(2, ws.max_row + 1):
-        cell = ws[f"{column_letter}{row}"]
-        if isinstance(cell.value, (int, float)):
-            font = cell.font
-            cell.number_format = '"$"#,##0.00'
-            cell.font = Font(
-                name=font.name,
-                size=font.size,
-                bold=font.bold,
-                italic=font.italic,
-                vertAlign=font.vertAlign,
-                underline=font.underline,
-                strike=font.strike,
-                color=font.color
-            )
+
+def amount_display_width(values):
+    # "$1,234.56" only gets longer as the magnitude grows, so the extremes decide the width
+    values = values.dropna()
+    if values.empty:
+        return 0
+    return max(len(f"${values.min():,.2f}"), len(f"${values.max():,.2f}"))
+
+
+def column_display_width(column):
+    values = column.dropna()
+    if values.empty:
+        return 0
+    if pd.api.types.is_bool_dtype(values):
+        return len("$1.00")
+    if pd.api.types.is_numeric_dtype(values):
+        return amount_display_width(values)
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return max(len(str(values.min())), len(str(values.max())))
+    return int(values.astype(str).str.len().max())
+
+
+def dataframe_column_widths(df):
+    return [max(len(str(name)), column_display_width(df[name])) for name in df.columns]
+
+
+def set_column_widths(ws, widths):
+    for idx, width in enumerate(widths, 1):
+        ws.column_dimensions[get_column_letter(idx)].width = width + 2
+
+
+def frame_cell_values(column):
+    # Column values as Python objects with None for missing entries
+    return column.astype(object).where(column.notna(), None).tolist()
+
+
+def styled_cell(ws, value, style=None, font=None):
+    cell = WriteOnlyCell(ws, value)
+    if style:
+        cell.style = style
+    if font:
+        cell.font = font
+    return cell
+
+
+def append_frame(ws, df, amount_column):
+    ws.append(list(df.columns))
+
+    columns = []
+    for name in df.columns:
+        values = frame_cell_values(df[name])
+        if name == amount_column:
+            values = [None if v is None else styled_cell(ws, v, "Amount") for v in values]
+        elif pd.api.types.is_datetime64_any_dtype(df[name]):
+            values = [None if v is None else styled_cell(ws, v, "Report Date") for v in values]
+        columns.append(values)
+
+    for row in zip(*columns):
+        ws.append(row)
+
+
+def unique_sheet_name(wb, name, suffix):
+    # Truncated names can collide across periods; a write-only sheet cannot be reopened. name is
+    # "<prefix>_<suffix>" cut to 31 characters; the counter shortens the prefix and goes before
+    # "_<suffix>", so the period still reads in full
+    prefix = name[:-len(suffix) - 1] if name.endswith(f"_{suffix}") else name
+    counter = 2
+    candidate = name
+    while candidate in wb.sheetnames:
+        tag = str(counter)
+        candidate = f"{prefix[:max(1, 30 - len(suffix) - len(tag))]}{tag}_{suffix}"[:31]
+        counter += 1
+    return candidate
+
+
+def discard_workbook(wb):
+    # Write-only sheets stream into temporary files until save(); close and remove them
+    for ws in wb.worksheets:
+        writer = getattr(ws, "_writer", None)
+        if writer is None:
+            continue
+        if not ws.closed:
+            ws.close()
+        if os.path.exists(writer.out):
+            os.remove(writer.out)
+
+
+def merge_cells(ws, cell_range):
+    if hasattr(ws, "merge_cells"):
+        ws.merge_cells(cell_range)
+    else:
+        ws.merged_cells.add(cell_range)
 
 
 
@@ -96,142 +249,289 @@ def add_radar_chart(ws, start_row, end_row):
 
 
 
-def write_period_sheets(df_period, suffix, writer, chart_type):
+def write_summary_sheet(book, suffix, totals, chart_type, scale=1, trace=None):
+    # totals holds the amount per category, in cents when scale is 100. Payments and expenses are
+    # added up before scaling, so cent totals stay exact
+    is_payment = is_payment_category(totals.index)
+    payment_total = sum(totals[is_payment])
+    expense_total = sum(totals[~is_payment])
+    net = expense_total + payment_total
+    if scale != 1:
+        totals, payment_total, expense_total, net = (totals / scale, payment_total / scale, expense_total / scale,
+                                                     net / scale)
+
+    summary_df = pd.DataFrame({"Expenses": totals.index, "Total Amount": totals.values})
+    summary_df.sort_values(by="Total Amount", ascending=False, inplace=True)
+
+    with trace_stage(trace, "summary"):
+        register_report_styles(book)
+
+        summary_rows = [("Credit Card Payments", payment_total), ("Expense Total", expense_total), ("Difference", net)]
+        title = f"Summary for {suffix}"
+        widths = dataframe_column_widths(summary_df)
+        widths[0] = max([widths[0], len(title)] + [len(label) for label, _ in summary_rows])
+        widths[1] = max(widths[1], amount_display_width(pd.Series([value for _, value in summary_rows], dtype="float64")))
+
+        worksheet = book.create_sheet(unique_sheet_name(book, f"Summary_{suffix}"[:31], suffix))
+        set_column_widths(worksheet, widths)
+
+        title_cell = styled_cell(worksheet, title, font=BOLD_FONT)
+        title_cell.alignment = Alignment(horizontal='center')
+        worksheet.append([title_cell])
+        merge_cells(worksheet, 'A1:B1')
+
+        for label, value in summary_rows:
+            font = BOLD_FONT
+            if label == "Difference":
+                font = Font(bold=True, color="FF0000" if net > 0 else "008000")
+            worksheet.append([styled_cell(worksheet, label, font=BOLD_FONT), styled_cell(worksheet, value, "Amount", font)])
+
+        worksheet.append([])
+        worksheet.append([styled_cell(worksheet, None, font=BOLD_FONT), styled_cell(worksheet, None, font=BOLD_FONT)])
+        append_frame(worksheet, summary_df, "Total Amount")
+
+    chart_type = chart_type.lower() if chart_type else "pie"
+
+
+    with trace_stage(trace, "chart", chart_type=chart_type):
+        if not summary_df.empty:    
+            if chart_type == "pie":
+                add_pie_chart(worksheet, 7, 6 + len(summary_df))
+            elif chart_type == "bar":
+                add_bar_chart(worksheet, 7, 6 + len(summary_df))
+            elif chart_type == "column":
+                add_column_chart(worksheet, 7, 6 + len(summary_df))
+            elif chart_type == "doughnut":
+                add_doughnut_chart(worksheet, 7, 6 + len(summary_df))
+            elif chart_type == "radar":
+                add_radar_chart(worksheet, 7, 6 + len(summary_df))
+
+    return worksheet
+
+
+def write_period_sheets(df_period, suffix, writer, chart_type, trace=None):
     from pandas.tseries.offsets import DateOffset, MonthBegin
 
-    categories = df_period["Category"].dropna().unique()
-    summary_data = []
-    sheet_queue = []
+    # One groupby pass; categories keep their order of first appearance.
+    # Totals are summed over the date-sorted slices so they stay bit-identical
+    # to the values earlier reports wrote; compact frames sum exact cents instead
+    with trace_stage(trace, "split", rows=len(df_period)):
+        scale = amount_scale(df_period)
+        amounts = df_period["Amount"]
+        df_period = plain_frame(df_period)
+        grouped = df_period.groupby("Category", sort=False)
+        category_frames = [(category, category_df.sort_values(by="Trans. date")) for category, category_df in grouped]
+        totals = pd.Series([amounts.loc[category_df.index].sum() for _, category_df in category_frames],
+                           index=pd.Index([category for category, _ in category_frames], dtype=object), dtype="float64")
 
-    payment_total = 0
-    expense_total = 0
+        sheet_queue = []
+        for category, category_df in category_frames:
+            total_row = pd.DataFrame({
+                "Description": ["TOTAL"],
+                "Amount": [totals[category] / scale]
+            })
+            final_df = pd.concat([category_df, total_row], ignore_index=True)
 
-    for category in categories:
-        category_df = df_period[df_period["Category"] == category].copy()
-        category_df.sort_values(by="Trans. date", inplace=True)
+            safe_category = re.sub(r'[:\\/*?\[\]]', '-', category[:20])
+            sheet_name = f"{safe_category}_{suffix}"[:31]
+            sheet_queue.append((sheet_name, final_df))
 
-        total = category_df["Amount"].sum()
-        summary_data.append((category, total))
+    book = getattr(writer, "book", writer)
+    sheet_names = [write_summary_sheet(book, suffix, totals, chart_type, scale, trace).title]
 
-        total_row = pd.DataFrame({
-            "Description": ["TOTAL"],
-            "Amount": [total]
-        })
-        final_df = pd.concat([category_df, total_row], ignore_index=True)
+    with trace_stage(trace, "category_sheets", sheets=len(sheet_queue)):
+        for catergory_sheet_name, data in sheet_queue:
+            ws = book.create_sheet(unique_sheet_name(book, catergory_sheet_name, suffix))
+            set_column_widths(ws, dataframe_column_widths(data))
+            append_frame(ws, data, "Amount")
+            sheet_names.append(ws.title)
 
-        safe_category = re.sub(r'[:\\/*?\[\]]', '-', category[:20])
-        sheet_name = f"{safe_category}_{suffix}"[:31]
-        sheet_queue.append((sheet_name, final_df))
+    return sheet_names
 
-        if "payment" in category.lower() or "credit" in category.lower():
-            payment_total += total
-        else:
-            expense_total += total
 
-    net = expense_total + payment_total
-    summary_df = pd.DataFrame(summary_data, columns=["Expenses", "Total Amount"])
-    summary_df.sort_values(by="Total Amount", ascending=False, inplace=True)
+def timed_read_statement(path):
+    started = time.perf_counter()
+    df = read_statement(path)
+    return df, time.perf_counter() - started
 
-    sheet_name = f"Summary_{suffix}"[:31]
-    summary_df.to_excel(writer, sheet_name=sheet_name, startrow=6, index=False)
-    worksheet = writer.book[sheet_name]
 
-    worksheet.merge_cells('A1:B1')
-    worksheet['A1'] = f"Summary for {suffix}"
-    worksheet['A1'].alignment = Alignment(horizontal='center')
-    worksheet['A1'].font = Font(bold=True)
+def iter_parsed_statements(paths, workers=None):
+    workers = workers or os.cpu_count() or 1
+    workers = min(workers, len(paths))
 
-    for idx, (label, value) in enumerate(zip(["Credit Card Payments", "Expense Total", "Difference"],
-                                             [payment_total, expense_total, net]), start=2):
-        worksheet[f'A{idx}'] = label
-        worksheet[f'B{idx}'] = value
-        worksheet[f'A{idx}'].font = Font(bold=True)
-        worksheet[f'B{idx}'].font = Font(bold=True)
+    if workers > 1 and len(paths) >= PARALLEL_MIN_FILES:
+        executor = ProcessPoolExecutor(max_workers=workers)
+        try:
+            # map() yields in submission order, so the concat order matches paths
+            yield from zip(paths, executor.map(timed_read_statement, paths))
+        finally:
+            # Files still queued are dropped when the caller stops early
+            executor.shutdown(cancel_futures=True)
+    else:
+        for path in paths:
+            yield path, timed_read_statement(path)
 
-    net_cell = worksheet['B4']
-    net_cell.font = Font(bold=True, color="FF0000" if net > 0 else "008000")
 
-    worksheet['A6'].font = Font(bold=True)
-    worksheet['B6'].font = Font(bold=True)
+def parse_statements(paths, workers=None, log=None, progress=None, cancel_event=None, on_parsed=None, compact=False):
+    dataframes = []
+    with closing(iter_parsed_statements(paths, workers)) as results:
+        for path, (df, elapsed) in results:
+            if on_parsed:
+                on_parsed(len(dataframes), df)
+            # Compacted as each statement arrives so the full frames never pile up
+            dataframes.append(compact_statement(df) if compact else df)
+            if log:
+                log(f"Parsed {os.path.basename(path)} ({len(df)} rows) in {elapsed:.2f}s")
+            if progress:
+                progress("parse", len(dataframes), len(paths))
+            check_cancelled(cancel_event)
+    return dataframes
 
-    auto_adjust_column_widths(worksheet)
-    format_amount_column(worksheet, "B")
-    chart_type = chart_type.lower() if chart_type else "pie"
 
+def compact_statement(df):
+    # Lean representation: each distinct description and category is stored once as a
+    # categorical, and amounts become exact integer cents
+    return pd.DataFrame({
+        "Trans. date": df["Trans. date"],
+        "Post date": df["Post date"],
+        "Description": df["Description"].astype("category"),
+        "Amount": (df["Amount"] * 100).round().astype("Int64"),
+        "Category": df["Category"].astype("category"),
+    })
 
-    if not summary_df.empty:    
-        if chart_type == "pie":
-            add_pie_chart(worksheet, 7, 6 + len(summary_df))
-        elif chart_type == "bar":
-            add_bar_chart(worksheet, 7, 6 + len(summary_df))
-        elif chart_type == "column":
-            add_column_chart(worksheet, 7, 6 + len(summary_df))
-        elif chart_type == "doughnut":
-            add_doughnut_chart(worksheet, 7, 6 + len(summary_df))
-        elif chart_type == "radar":
-            add_radar_chart(worksheet, 7, 6 + len(summary_df))
 
+def amount_scale(df):
+    # Compact frames keep amounts in cents
+    return 100 if pd.api.types.is_integer_dtype(df["Amount"]) else 1
 
-    for catergory_sheet_name, data in sheet_queue:
-        data.to_excel(writer, sheet_name=catergory_sheet_name, index=False)
-        ws = writer.book[catergory_sheet_name]
-        auto_adjust_column_widths(ws)
-        format_amount_column(ws, "D")
 
+def plain_frame(df):
+    # Back to the strings and float dollars the report writers use; plain frames pass through untouched
+    if amount_scale(df) == 1:
+        return df
+    return df.assign(
+        Description=df["Description"].astype("str"),
+        Amount=(df["Amount"] / 100).astype("float64"),
+        Category=df["Category"].astype("str"),
+    )
 
 
+def concat_frames(dataframes):
+    # pd.concat turns categoricals with different categories into object columns, so those are unioned instead
+    if not dataframes or amount_scale(dataframes[0]) == 1:
+        return pd.concat(dataframes, ignore_index=True)
+    categorical = ["Description", "Category"]
+    df = pd.concat([d.drop(columns=categorical) for d in dataframes], ignore_index=True)
+    for column in categorical:
+        df[column] = union_categoricals([d[column] for d in dataframes], sort_categories=True)
+    return df[dataframes[0].columns]
 
-def main_processing_function(folder_path, start_date, end_date, output_folder=None, group_mode="Monthly", use_csv=False, chart_type = "Pie"):
-    from pandas.tseries.offsets import MonthEnd
-    from datetime import timedelta
-    import pandas as pd
-    import os
 
-    start_date = pd.to_datetime(start_date)
-    end_date = pd.to_datetime(end_date)
+def in_date_range(df, start_date, end_date):
+    # Returns the frame itself rather than a copy when every row is already in range
+    mask = (df["Trans. date"] >= start_date) & (df["Trans. date"] <= end_date)
+    return df if mask.all() else df[mask]
 
-    # Output folder logic
-    if not output_folder:
-        output_folder = os.path.join(folder_path, "CleanStatementsCSV" if use_csv else "CleanStatements")
-    os.makedirs(output_folder, exist_ok=True)
 
-    # Base file name
-    base_filename = f"Sorted_{start_date.strftime('%Y-%m-%d')}_to_{end_date.strftime('%Y-%m-%d')}_{group_mode.lower()}"
-    extension = "csv" if use_csv else "xlsx"
-    output_path = os.path.join(output_folder, f"{base_filename}.{extension}")
+def deduplicate_transactions(df, sources):
+    # A row repeated inside one statement is a separate charge, so rows are matched by
+    # fingerprint and occurrence number: the n-th copy in a later statement is the same
+    # charge exported twice and is dropped
+    fingerprints = pd.util.hash_pandas_object(df[DEDUP_COLUMNS], index=False).to_numpy()
 
-    # Resolve filename conflicts
-    counter = 1
-    while os.path.exists(output_path):
-        output_path = os.path.join(output_folder, f"{base_filename}_copy{counter}.{extension}")
-        counter += 1
+    # Only rows whose fingerprint repeats can be duplicates; usually none do and the frame is returned as is
+    ordered = np.sort(fingerprints)
+    repeated_values = ordered[1:][ordered[1:] == ordered[:-1]]
+    if not len(repeated_values):
+        return df, 0
+    candidates = np.flatnonzero(np.isin(fingerprints, repeated_values))
 
-    # Load Discover .xlsx files
-    file_list = [f for f in os.listdir(folder_path) if f.startswith("Discover") and f.endswith(".xlsx")]
-    if not file_list:
-        raise FileNotFoundError("No Discover .xlsx files found in the selected folder.")
+    keys = pd.DataFrame({"source": np.asarray(sources)[candidates], "fingerprint": fingerprints[candidates]})
+    occurrence = keys.groupby(["source", "fingerprint"], sort=False).cumcount().to_numpy()
+    dropped = pd.DataFrame({"fingerprint": keys["fingerprint"], "occurrence": occurrence}).duplicated().to_numpy()
+    duplicated = np.zeros(len(df), dtype=bool)
+    duplicated[candidates[dropped]] = True
+    return df[~duplicated].reset_index(drop=True), int(dropped.sum())
 
-    dataframes = []
-    for file in file_list:
-        df = pd.read_excel(
-            os.path.join(folder_path, file),
-            skiprows=11,
-            names=["Trans. date", "Post date", "Description", "Amount", "Category"]
-        )
-        dataframes.append(df)
 
-    df = pd.concat(dataframes, ignore_index=True)
-    df = df.dropna(subset=["Trans. date"])
-    df["Amount"] = pd.to_numeric(df["Amount"], errors="coerce")
-    df["Trans. date"] = pd.to_datetime(df["Trans. date"], format="%m/%d/%Y", errors="coerce")
-    df["Post date"] = pd.to_datetime(df["Post date"], format="%m/%d/%Y", errors="coerce")
-    df = df.dropna(subset=["Trans. date"])
-    df = df[(df["Trans. date"] >= start_date) & (df["Trans. date"] <= end_date)]
+def concat_statements(dataframes, deduplicate=True, log=None):
+    df = concat_frames(dataframes)
+    if deduplicate and len(dataframes) > 1:
+        sources = np.repeat(np.arange(len(dataframes)), [len(d) for d in dataframes])
+        df, dropped = deduplicate_transactions(df, sources)
+        if log:
+            log(f"Dropped {dropped} duplicate transactions from overlapping statements")
+    return df
+
 
-    if df.empty:
-        raise ValueError("No transactions found in the selected date range.")
+def load_statements(folder_path, file_list, use_cache=True, rebuild_cache=False, cache_dir=None, workers=None, log=None,
+                    progress=None, cancel_event=None, deduplicate=True, trace=None, compact=False):
+    paths = [os.path.join(folder_path, file) for file in file_list]
+    if not use_cache:
+        with trace_stage(trace, "parse", files=len(paths)):
+            dataframes = parse_statements(paths, workers, log, progress, cancel_event, compact=compact)
+        with trace_stage(trace, "clean") as stage:
+            df = concat_statements(dataframes, deduplicate, log)
+            stage["rows"] = len(df)
+        return df
+
+    cache = StatementCache(cache_dir or default_cache_dir(folder_path))
+    if rebuild_cache:
+        cache.clear()
+    else:
+        cache.prune(paths)
+
+    dataframes = [None] * len(paths)
+    misses = []
+    with trace_stage(trace, "cache_lookup", files=len(paths)):
+        for i, path in enumerate(paths):
+            df, fingerprint = cache.lookup(path)
+            if df is None:
+                misses.append((i, path, fingerprint))
+            else:
+                dataframes[i] = compact_statement(df) if compact else df
+    if log:
+        log(f"Loaded {len(paths) - len(misses)} of {len(paths)} statements from cache")
+
+    # The cache always holds the full frames, so it serves both modes
+    def store_parsed(miss_index, df):
+        _, path, fingerprint = misses[miss_index]
+        cache.store(path, df, fingerprint)
+
+    # Statements parsed before a cancel stay cached for the next run
+    try:
+        with trace_stage(trace, "parse", files=len(misses)):
+            parsed = parse_statements([path for _, path, _ in misses], workers, log, progress, cancel_event, store_parsed,
+                                      compact)
+    finally:
+        cache.save_index()
+    for (i, _, _), df in zip(misses, parsed):
+        dataframes[i] = df
+
+    with trace_stage(trace, "clean") as stage:
+        df = concat_statements(dataframes, deduplicate, log)
+        stage["rows"] = len(df)
+    return df
+
+
+def ingest_statements(store, folder_path, file_list, workers=None, log=None, progress=None, cancel_event=None):
+    paths = [os.path.join(folder_path, file) for file in file_list]
+    store.remove_missing(folder_path, paths)
+    stale = store.stale_sources(paths)
+    if log:
+        log(f"{len(paths) - len(stale)} of {len(paths)} statements already in the transaction store")
+
+    def store_parsed(index, df):
+        path, fingerprint = stale[index]
+        store.replace_source(path, fingerprint, df)
+
+    parse_statements([path for path, _ in stale], workers, log, progress, cancel_event, store_parsed)
+
+
+def build_periods(start_date, end_date, group_mode):
+    from pandas.tseries.offsets import MonthEnd
+    from datetime import timedelta
 
-    # Build time periods
     periods = []
     current = start_date
     while current <= end_date:
@@ -245,62 +545,1041 @@ def main_processing_function(folder_path, start_date, end_date, output_folder=No
             raise ValueError(f"Unsupported grouping mode: {group_mode}")
         periods.append((current, min(next_end, end_date)))
         current = next_end + timedelta(days=1)
+    return periods
+
+
+def assign_periods(dates, periods):
+    # Periods are contiguous and sorted, so one searchsorted over the starts
+    # labels every transaction; -1 marks dates outside every period
+    starts = pd.DatetimeIndex([start for start, _ in periods]).values.astype("datetime64[ns]")
+    ends = pd.DatetimeIndex([end for _, end in periods]).values.astype("datetime64[ns]")
+    values = np.asarray(dates, dtype="datetime64[ns]")
+
+    labels = np.searchsorted(starts, values, side="right") - 1
+    inside = labels >= 0
+    inside[inside] = values[inside] <= ends[labels[inside]]
+    labels[~inside] = -1
+    return labels
+
+
+def group_by_period(df, periods):
+    if not periods:
+        return
+    labels = assign_periods(df["Trans. date"], periods)
+    for label, period_df in df.groupby(labels, sort=True):
+        if label < 0:
+            continue
+        start, end = periods[label]
+        yield label + 1, start, end, period_df
+
+
+def count_periods(df, periods):
+    if not periods:
+        return 0
+    labels = assign_periods(df["Trans. date"], periods)
+    return len(np.unique(labels[labels >= 0]))
+
+
+def track_periods(period_groups, total, progress=None, cancel_event=None):
+    for done, group in enumerate(period_groups, 1):
+        check_cancelled(cancel_event)
+        yield group
+        if progress:
+            progress("render", done, total)
+
+
+def csv_period_suffix(i, start, end, group_mode):
+    if group_mode.lower() == "biweekly":
+        suffix = "First_Half" if start.day == 1 else "Second_Half"
+        suffix += f"_{start.strftime('%b_%d')}_to_{end.strftime('%b_%d')}"
+    elif group_mode.lower() == "monthly":
+        suffix = f"{start.strftime('%B_%Y')}"
+    else:
+        suffix = f"Week_{i}_{start.strftime('%b_%d')}_to_{end.strftime('%b_%d')}"
+    return suffix
+
+
+def excel_period_suffix(i, start, end, group_mode):
+    if group_mode.lower() == "biweekly":
+        suffix = "First Half" if start.day < 15 else "Second Half"
+        suffix += f" ({start.strftime('%b %d')} – {end.strftime('%b %d')})"
+    elif group_mode.lower() == "monthly":
+        suffix = f"{start.strftime('%B %Y')}"
+    else:
+        suffix = f"Week {i} ({start.strftime('%b %d')} – {end.strftime('%b %d')})"
+    return suffix
+
+
+def write_period_csv(period_df, f):
+    scale = amount_scale(period_df)
+    amounts = period_df["Amount"]
+    period_df = plain_frame(period_df).sort_values(by=["Category", "Trans. date"])
+
+    # Format whole columns up front instead of row by row
+    formatted = pd.DataFrame({
+        "Trans. date": period_df["Trans. date"].dt.strftime("%Y-%m-%d"),
+        "Post date": period_df["Post date"].dt.strftime("%Y-%m-%d").fillna(""),
+        "Description": period_df["Description"].fillna(""),
+        "Amount": np.char.mod("%.2f", period_df["Amount"].to_numpy(dtype="float64")),
+        "Category": period_df["Category"],
+    }, index=period_df.index)
+    subtotals = amounts.loc[period_df.index].groupby(period_df["Category"], sort=False).sum() / scale
+
+    # Same layout and line endings DataFrame.to_csv produced for the old row list
+    writer = csv.writer(f, lineterminator=os.linesep)
+    for category, block in formatted.groupby(period_df["Category"], sort=False):
+        writer.writerow([f"Category: {category}", "", "", "", ""])
+        writer.writerow(STATEMENT_COLUMNS)
+        writer.writerows(block.itertuples(index=False, name=None))
+        writer.writerow(["", "", "Subtotal:", f"{subtotals[category]:.2f}", ""])
+        writer.writerow(["", "", "", "", ""])  # spacer
+
+
+def cached_period_csv(period_df, render_cache):
+    # Path of the period's CSV in the render cache, written there first when the cache does not have it
+    def write(path):
+        with open(path, "w", encoding="utf-8", newline="", buffering=CSV_BUFFER_SIZE) as f:
+            write_period_csv(period_df, f)
+    return render_cache.render(render_cache.key(period_df, format="csv"), "csv", write)
+
+
+def source_fingerprints(folder_path, file_list, cache_dir=None):
+    # Reuses the statement cache's hashes, so unchanged files are only stat()ed
+    cache = StatementCache(cache_dir or default_cache_dir(folder_path))
+    sources = {}
+    for file in file_list:
+        path = os.path.join(folder_path, file)
+        sources[file] = file_fingerprint(path, cache.entries.get(os.path.abspath(path)))["sha1"]
+    return sources
+
+
+def report_is_current(previous, output_folder, sources, end_date, chart_type, use_csv, rules=None, settings=None):
+    if not previous:
+        return False
+    if previous["sources"] != sources or previous["end_date"] != end_date.strftime("%Y-%m-%d"):
+        return False
+    if previous.get("rules") != rules or previous.get("settings") != settings:
+        return False
+    if use_csv:
+        return all(os.path.exists(os.path.join(output_folder, name))
+                   for period in previous["periods"] for name in period["outputs"])
+    return previous["chart_type"] == chart_type and os.path.exists(previous["output_path"])
+
+
+def plan_report_periods(df, periods, group_mode, use_csv, previous, settings=None):
+    # A period is reused only when its boundaries, label and transactions all match the last run, and the
+    # last run loaded the transactions the same way
+    if previous and previous.get("settings") == settings:
+        previous_periods = {period["start"]: period for period in previous["periods"]}
+    else:
+        previous_periods = {}
+    planned = []
+    for i, start, end, period_df in group_by_period(df, periods):
+        suffix = csv_period_suffix(i, start, end, group_mode) if use_csv else excel_period_suffix(i, start, end, group_mode)
+        period = {
+            "start": start.strftime("%Y-%m-%d"),
+            "end": end.strftime("%Y-%m-%d"),
+            "suffix": suffix,
+            "fingerprint": period_fingerprint(period_df),
+            "outputs": None
+        }
+        old = previous_periods.get(period["start"])
+        if old and all(old[field] == period[field] for field in ("end", "suffix", "fingerprint")):
+            period["outputs"] = old["outputs"]
+        planned.append(period)
+    return planned
+
+
+def render_stale_periods(df, periods, planned, render, progress=None, cancel_event=None):
+    stale = sum(1 for period in planned if period["outputs"] is None)
+    done = 0
+    for (i, start, end, period_df), period in zip(group_by_period(df, periods), planned):
+        if period["outputs"] is not None:
+            continue
+        check_cancelled(cancel_event)
+        period["outputs"] = render(period, period_df)
+        done += 1
+        if progress:
+            progress("render", done, stale)
+    return done
+
+
+def update_excel_report(df, periods, planned, previous, output_path, chart_type, log=None, progress=None, cancel_event=None):
+    existing_path = previous["output_path"] if previous else None
+    reuse = bool(existing_path and os.path.exists(existing_path) and previous["chart_type"] == chart_type)
+
+    if reuse:
+        wb = load_workbook(existing_path)
+        kept = {name for period in planned if period["outputs"] for name in period["outputs"]}
+        for old in previous["periods"]:
+            for name in old["outputs"]:
+                if name not in kept and name in wb.sheetnames:
+                    del wb[name]
+    else:
+        for period in planned:
+            period["outputs"] = None
+        wb = Workbook(write_only=True)
+
+    try:
+        rendered = render_stale_periods(
+            df, periods, planned,
+            lambda period, period_df: write_period_sheets(period_df, period["suffix"], wb, chart_type),
+            progress, cancel_event
+        )
+    except ReportCancelled:
+        if not reuse:
+            discard_workbook(wb)
+        raise
+
+    if reuse:
+        # New sheets were appended at the end; put every sheet back in period order
+        ordered = [wb[name] for period in planned for name in period["outputs"]]
+        ordered += [ws for ws in wb.worksheets if all(ws is not other for other in ordered)]
+        for index, ws in enumerate(ordered):
+            wb.move_sheet(ws, index - wb.index(ws))
+
+    tmp_path = output_path + ".tmp"
+    wb.save(tmp_path)
+    os.replace(tmp_path, output_path)
+    if existing_path and existing_path != output_path and os.path.exists(existing_path):
+        os.remove(existing_path)
+
+    if log:
+        log(f"Re-rendered {rendered} of {len(planned)} periods")
+    return output_path
+
+
+def update_csv_reports(df, periods, planned, previous, output_folder, base_filename, log=None, progress=None, cancel_event=None):
+    # Untouched period files are only renamed when the report's end date moved
+    for period in planned:
+        if period["outputs"] is None:
+            continue
+        old_name = period["outputs"][0]
+        new_name = f"{base_filename}_{period['suffix']}.csv"
+        old_path = os.path.join(output_folder, old_name)
+        if not os.path.exists(old_path):
+            period["outputs"] = None
+        elif old_name != new_name:
+            os.replace(old_path, os.path.join(output_folder, new_name))
+            period["outputs"] = [new_name]
+
+    def render(period, period_df):
+        name = f"{base_filename}_{period['suffix']}.csv"
+        with open(os.path.join(output_folder, name), "w", encoding="utf-8", newline="", buffering=CSV_BUFFER_SIZE) as f:
+            write_period_csv(period_df, f)
+        return [name]
+
+    rendered = render_stale_periods(df, periods, planned, render, progress, cancel_event)
+
+    current = {name for period in planned for name in period["outputs"]}
+    for old in (previous["periods"] if previous else []):
+        for name in old["outputs"]:
+            path = os.path.join(output_folder, name)
+            if name not in current and os.path.exists(path):
+                os.remove(path)
+
+    if log:
+        log(f"Re-rendered {rendered} of {len(planned)} periods")
+    return output_folder
+
+
+def stream_statements(paths, periods, spill, chunk_size=None, log=None, progress=None, cancel_event=None):
+    # Reads the statements chunk by chunk; in-range rows go to the spill bucket of their period and only
+    # running per-period, per-category totals stay in memory. Returns those totals indexed by (period, category)
+    aggregates = None
+    for source, path in enumerate(paths):
+        rows = 0
+        for chunk in iter_statement_chunks(path, chunk_size or STREAM_CHUNK_ROWS):
+            check_cancelled(cancel_event)
+            labels = assign_periods(chunk["Trans. date"], periods)
+            inside = labels >= 0
+            if not inside.any():
+                continue
+            # The source index lets each period be deduplicated on its own once it is read back
+            chunk = chunk[inside].assign(Source=source)
+            labels = labels[inside]
+            rows += len(chunk)
+
+            for label, part in chunk.groupby(labels, sort=True):
+                spill.append(label, part)
+            totals = chunk.groupby([labels, chunk["Category"]], dropna=False)["Amount"].agg(["sum", "count"])
+            aggregates = totals if aggregates is None else aggregates.add(totals, fill_value=0)
+        if log:
+            log(f"Streamed {os.path.basename(path)} ({rows} rows in range)")
+        if progress:
+            progress("parse", source + 1, len(paths))
+
+    if aggregates is None:
+        return pd.DataFrame({"sum": pd.Series(dtype="float64"), "count": pd.Series(dtype="int64")})
+    aggregates["count"] = aggregates["count"].astype("int64")
+    aggregates.index.names = ["period", "Category"]
+    return aggregates
+
+
+def iter_spilled_periods(spill, periods, labels, deduplicate=True, compact=False, log=None, category_rules=None):
+    # Materializes one period at a time; copies of one charge share a date and so a period,
+    # which makes per-period deduplication match deduplicating everything at once
+    dropped = 0
+    for label in labels:
+        period_df = spill.read(label)
+        sources = period_df.pop("Source").to_numpy()
+        if deduplicate:
+            period_df, count = deduplicate_transactions(period_df, sources)
+            dropped += count
+        if category_rules:
+            # The rules' memo carries over, so a merchant is only matched in the first period it shows up in
+            period_df = category_rules.apply(period_df)
+        start, end = periods[label]
+        yield label + 1, start, end, compact_statement(period_df) if compact else period_df
+    if deduplicate and log:
+        log(f"Dropped {dropped} duplicate transactions from overlapping statements")
+
+
+def stream_report(folder_path, file_list, periods, group_mode, use_csv, chart_type, csv_archive, output_folder, base_filename,
+                  output_path, chunk_size=None, deduplicate=True, compact=False, log=None, progress=None, cancel_event=None,
+                  trace=None, period_workers=None, workbook_per_period=False, category_rules=None, render_cache=None,
+                  columnar_format=None):
+    paths = [os.path.join(folder_path, file) for file in file_list]
+    with PeriodSpill() as spill:
+        with trace_stage(trace, "stream", files=len(paths)) as stage:
+            aggregates = stream_statements(paths, periods, spill, chunk_size, log, progress, cancel_event)
+            stage["rows"] = int(aggregates["count"].sum())
+        if aggregates.empty:
+            raise NoTransactionsFound("No transactions found in the selected date range.")
+
+        labels = sorted(aggregates.index.get_level_values("period").unique())
+        if log:
+            log(f"{int(aggregates['count'].sum())} transactions in range across {len(labels)} periods "
+                f"(net {aggregates['sum'].sum():,.2f})")
+        with trace_stage(trace, "render", rows=int(aggregates["count"].sum())):
+            period_groups = iter_spilled_periods(spill, periods, labels, deduplicate, compact, log, category_rules)
+            return render_period_groups(period_groups, len(labels),
+                                        group_mode, use_csv, chart_type, csv_archive, output_folder, base_filename,
+                                        output_path, progress, cancel_event, trace, period_workers, workbook_per_period,
+                                        render_cache, columnar_format)
+
+
+def categorize_transactions(df, category_rules=None, trace=None):
+    # User rules re-file charges the issuer categorized differently, before anything is grouped by category
+    if not category_rules:
+        return df
+    with trace_stage(trace, "categorize", rows=len(df), rules=len(category_rules)):
+        return category_rules.apply(df)
+
+
+def load_category_cube(folder_path, file_list, use_cache=True, rebuild_cache=False, cache_dir=None, workers=None, log=None,
+                       progress=None, cancel_event=None, deduplicate=True, trace=None, compact=False, category_rules=None):
+    # Day x category totals of every transaction in the folder, kept next to the statement cache so any
+    # date range or grouping is answered without reloading until a statement or the rules change
+    cube_path = os.path.join(cache_dir or default_cache_dir(folder_path), CUBE_FILENAME)
+    key = cube_key(source_fingerprints(folder_path, file_list, cache_dir), deduplicate,
+                   category_rules.fingerprint if category_rules else None)
+    cube = CategoryCube.load(cube_path, key) if use_cache and not rebuild_cache else None
+    if cube is not None:
+        if log:
+            log(f"Using saved category totals for {len(file_list)} statements")
+        return cube
+
+    df = load_statements(folder_path, file_list, use_cache, rebuild_cache, cache_dir, workers, log, progress, cancel_event,
+                         deduplicate, trace, compact)
+    df = categorize_transactions(df, category_rules, trace)
+    with trace_stage(trace, "cube", rows=len(df)) as stage:
+        cube = CategoryCube.from_frame(df, key)
+        stage["days"] = cube.days
+        if use_cache:
+            cube.save(cube_path)
+    return cube
+
+
+def render_summary_report(cube, periods, group_mode, chart_type, output_path, progress=None, cancel_event=None, trace=None):
+    # Summary sheets and charts only, straight from the cube's running sums
+    period_totals = list(cube.regroup(periods))
+    if not period_totals:
+        raise NoTransactionsFound("No transactions found in the selected date range.")
+    wb = Workbook(write_only=True)
+    try:
+        for i, start, end, totals in track_periods(period_totals, len(period_totals), progress, cancel_event):
+            with trace_stage(trace, "write_summary_sheet", categories=len(totals)):
+                write_summary_sheet(wb, excel_period_suffix(i, start, end, group_mode), totals["cents"], chart_type, 100,
+                                    trace)
+    except ReportCancelled:
+        discard_workbook(wb)
+        raise
+    with trace_stage(trace, "save"):
+        wb.save(output_path)
+    return output_path
+
+
+def list_statement_files(folder_path):
+    # Any file whose first rows a registered statement format recognizes, whatever it is named
+    file_list = sorted(f for f in os.listdir(folder_path)
+                       if f.lower().endswith(STATEMENT_EXTENSIONS) and detect_statement_format(os.path.join(folder_path, f)))
+    if not file_list:
+        raise FileNotFoundError("No recognized .xlsx, .csv, .ofx or .qfx statements found in the selected folder.")
+    return file_list
+
+
+def load_transactions(folder_path, file_list, start_date, end_date, use_cache=True, rebuild_cache=False, cache_dir=None,
+                      workers=None, log=None, progress=None, cancel_event=None, store_path=None, deduplicate=True,
+                      trace=None, compact=False):
+    if store_path:
+        # Only new or changed statements are ingested; the date index then serves just this range
+        with TransactionStore(store_path) as store:
+            with trace_stage(trace, "ingest", files=len(file_list)):
+                ingest_statements(store, folder_path, file_list, workers, log, progress, cancel_event)
+            with trace_stage(trace, "query") as stage:
+                df = store.query(folder_path, start_date, end_date, with_source=deduplicate)
+                stage["rows"] = len(df)
+        if deduplicate:
+            # Copies of one charge share its date, so deduplicating the range is enough
+            with trace_stage(trace, "clean") as stage:
+                sources, _ = pd.factorize(df.pop("Source"))
+                df, dropped = deduplicate_transactions(df, sources)
+                stage["rows"] = len(df)
+            if log:
+                log(f"Dropped {dropped} duplicate transactions from overlapping statements")
+        return compact_statement(df) if compact else df
+
+    df = load_statements(folder_path, file_list, use_cache, rebuild_cache, cache_dir, workers, log, progress, cancel_event,
+                         deduplicate, trace, compact)
+    with trace_stage(trace, "filter") as stage:
+        df = in_date_range(df, start_date, end_date)
+        stage["rows"] = len(df)
+    return df
+
+
+def report_base_filename(start_date, end_date, group_mode):
+    return f"Sorted_{start_date.strftime('%Y-%m-%d')}_to_{end_date.strftime('%Y-%m-%d')}_{group_mode.lower()}"
+
+
+def resolve_output_path(output_folder, base_filename, extension, reserved=()):
+    # reserved holds paths claimed by other reports of the same batch that are not written yet
+    output_path = os.path.join(output_folder, f"{base_filename}.{extension}")
+    counter = 1
+    while os.path.exists(output_path) or output_path in reserved:
+        output_path = os.path.join(output_folder, f"{base_filename}_copy{counter}.{extension}")
+        counter += 1
+    return output_path
+
+
+def render_period_workbook(period_df, suffix, chart_type, path):
+    # One period's sheets as a standalone workbook; runs in a worker process when rendering in parallel
+    wb = Workbook(write_only=True)
+    seed_report_styles(wb)
+    sheet_names = write_period_sheets(period_df, suffix, wb, chart_type)
+    wb.save(path)
+    return sheet_names
+
+
+def render_period_workbooks(period_groups, group_mode, chart_type, period_path, workers=None):
+    # Yields (path, suffix, sheet names) in period order. Only a couple of periods per worker are handed out
+    # ahead of the one being waited on, so streamed periods are not all pulled into memory at once
+    if not workers or workers <= 1:
+        for i, start, end, period_df in period_groups:
+            path = period_path(i, start, end)
+            suffix = excel_period_suffix(i, start, end, group_mode)
+            yield path, suffix, render_period_workbook(period_df, suffix, chart_type, path)
+        return
+
+    executor = ProcessPoolExecutor(max_workers=workers)
+    pending = deque()
+    try:
+        for i, start, end, period_df in period_groups:
+            path = period_path(i, start, end)
+            suffix = excel_period_suffix(i, start, end, group_mode)
+            pending.append((path, suffix, executor.submit(render_period_workbook, period_df, suffix, chart_type, path)))
+            if len(pending) >= 2 * workers:
+                path, suffix, future = pending.popleft()
+                yield path, suffix, future.result()
+        while pending:
+            path, suffix, future = pending.popleft()
+            yield path, suffix, future.result()
+    finally:
+        executor.shutdown(cancel_futures=True)
+
+
+def workbook_sheet_names(path):
+    # Read from the workbook part alone, without loading any sheet
+    with zipfile.ZipFile(path) as archive:
+        root = ElementTree.fromstring(archive.read("xl/workbook.xml"))
+    return [sheet.get("name") for sheet in root.iter(SHEET_TAG)]
+
+
+def cached_period_workbooks(period_groups, group_mode, chart_type, render_cache, workers=None):
+    # Yields (i, start, end, path, sheet names) in period order, where path is the period's workbook in the
+    # render cache. Only the periods the cache has not seen are rendered, in workers processes when given
+    order = deque()
+    scratch = render_cache.scratch_dir()
+
+    def misses():
+        for i, start, end, period_df in period_groups:
+            suffix = excel_period_suffix(i, start, end, group_mode)
+            key = render_cache.key(period_df, format="xlsx", group_mode=group_mode, chart_type=chart_type, suffix=suffix,
+                                   styles=report_style_fingerprint())
+            path = render_cache.fetch(key, "xlsx")
+            sheet_names = None
+            if path:
+                try:
+                    sheet_names = workbook_sheet_names(path)
+                except (OSError, KeyError, zipfile.BadZipFile, ElementTree.ParseError):
+                    # A damaged part is rendered again and replaced
+                    path = None
+            order.append((i, start, end, key, path, sheet_names))
+            if path is None:
+                yield i, start, end, period_df
+
+    def cached():
+        while order and order[0][4] is not None:
+            i, start, end, _, path, sheet_names = order.popleft()
+            yield i, start, end, path, sheet_names
+
+    try:
+        for path, _, sheet_names in render_period_workbooks(misses(), group_mode, chart_type,
+                                                         lambda i, start, end: os.path.join(scratch, f"period_{i}.xlsx"),
+                                                         workers):
+            # Periods are rendered in order, so this is the first one the cache did not have
+            yield from cached()
+            i, start, end, key, _, _ = order.popleft()
+            yield i, start, end, render_cache.store(key, "xlsx", path), sheet_names
+        yield from cached()
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+
+def assemble_period_workbooks(parts, output_path):
+    # Combines per-period workbooks into one with their sheets in period order. A write-only skeleton
+    # with the final sheet names (and a placeholder chart where a period drew one) provides the
+    # workbook-level parts; every sheet, drawing and chart is copied over from the workbook it was
+    # rendered in. Cell style ids carry over as-is because every workbook was seeded the same way
+    skeleton = Workbook(write_only=True)
+    seed_report_styles(skeleton)
+    sources = {}
+    sheet_count = drawing_count = 0
+    for path, suffix, sheet_names in parts:
+        with zipfile.ZipFile(path) as part:
+            members = set(part.namelist())
+        drawings = 0
+        for index, name in enumerate(sheet_names, 1):
+            ws = skeleton.create_sheet(unique_sheet_name(skeleton, name, suffix))
+            sheet_count += 1
+            sources[f"xl/worksheets/sheet{sheet_count}.xml"] = (path, f"xl/worksheets/sheet{index}.xml", None)
+            if f"xl/worksheets/_rels/sheet{index}.xml.rels" not in members:
+                continue
+            # Each chart helper draws one chart per sheet
+            ws.add_chart(PieChart(), "D2")
+            drawings += 1
+            drawing_count += 1
+            rename = (name, ws.title) if name != ws.title else None
+            sources[f"xl/drawings/drawing{drawing_count}.xml"] = (path, f"xl/drawings/drawing{drawings}.xml", None)
+            sources[f"xl/charts/chart{drawing_count}.xml"] = (path, f"xl/charts/chart{drawings}.xml", rename)
+
+    buffer = io.BytesIO()
+    skeleton.save(buffer)
+    part = part_path = None
+    try:
+        with zipfile.ZipFile(buffer) as base, \
+                zipfile.ZipFile(output_path, "w", zipfile.ZIP_DEFLATED, allowZip64=True) as archive:
+            styles = base.read("xl/styles.xml")
+            for member in base.namelist():
+                if member not in sources:
+                    archive.writestr(member, base.read(member))
+                    continue
+                path, source, rename = sources[member]
+                if path != part_path:
+                    if part:
+                        part.close()
+                    part, part_path = zipfile.ZipFile(path), path
+                    if part.read("xl/styles.xml") != styles:
+                        raise RuntimeError(f"{os.path.basename(path)} was rendered with a different style table")
+                if rename:
+                    # The chart points at its summary sheet by name, which changed if it collided with an earlier one
+                    old, new = (escape(quote_sheetname(title) + "!").encode("utf-8") for title in rename)
+                    archive.writestr(member, part.read(source).replace(old, new))
+                    continue
+                with part.open(source) as src, archive.open(member, "w") as dst:
+                    shutil.copyfileobj(src, dst, CSV_BUFFER_SIZE)
+    finally:
+        if part:
+            part.close()
+    return sheet_count
+
+
+def render_report(df, periods, group_mode, use_csv, chart_type, csv_archive, output_folder, base_filename, output_path,
+                  progress=None, cancel_event=None, trace=None, period_workers=None, workbook_per_period=False,
+                  render_cache=None, columnar_format=None):
+    return render_period_groups(group_by_period(df, periods), count_periods(df, periods), group_mode, use_csv, chart_type,
+                                csv_archive, output_folder, base_filename, output_path, progress, cancel_event, trace,
+                                period_workers, workbook_per_period, render_cache, columnar_format)
+
+
+def render_period_groups(period_groups, total, group_mode, use_csv, chart_type, csv_archive, output_folder, base_filename,
+                         output_path, progress=None, cancel_event=None, trace=None, period_workers=None,
+                         workbook_per_period=False, render_cache=None, columnar_format=None):
+    # period_groups yields (i, start, end, period_df) in period order. With a render_cache, periods whose
+    # transactions and settings were rendered before are copied from it instead of being rendered again
+    period_groups = track_periods(period_groups, total, progress, cancel_event)
+
+    # --- PARQUET / ARROW OUTPUT ---
+    if columnar_format:
+        return write_columnar_report(period_groups, columnar_format, output_path, trace)
 
     # --- CSV OUTPUT ---
     if use_csv:
-        for i, (start, end) in enumerate(periods, 1):
-            period_df = df[(df["Trans. date"] >= start) & (df["Trans. date"] <= end)].copy()
-            if not period_df.empty:
-                period_df.sort_values(by=["Category", "Trans. date"], inplace=True)
-
-                output_rows = []
-
-                for category in period_df["Category"].dropna().unique():
-                    cat_df = period_df[period_df["Category"] == category]
-                    output_rows.append([f"Category: {category}", "", "", "", ""])
-                    output_rows.append(["Trans. date", "Post date", "Description", "Amount", "Category"])
-                    for _, row in cat_df.iterrows():
-                        output_rows.append([
-                            row["Trans. date"].strftime("%Y-%m-%d"),
-                            row["Post date"].strftime("%Y-%m-%d") if pd.notnull(row["Post date"]) else "",
-                            row["Description"],
-                            f"{row['Amount']:.2f}",
-                            row["Category"]
-                        ])
-                    output_rows.append(["", "", "Subtotal:", f"{cat_df['Amount'].sum():.2f}", ""])
-                    output_rows.append([])  # spacer
-
-                output_df = pd.DataFrame(output_rows)
-
-                if group_mode.lower() == "biweekly":
-                    suffix = "First_Half" if start.day == 1 else "Second_Half"
-                    suffix += f"_{start.strftime('%b_%d')}_to_{end.strftime('%b_%d')}"
-                elif group_mode.lower() == "monthly":
-                    suffix = f"{start.strftime('%B_%Y')}"
-                else:
-                    suffix = f"Week_{i}_{start.strftime('%b_%d')}_to_{end.strftime('%b_%d')}"
+        if csv_archive:
+            try:
+                with zipfile.ZipFile(output_path, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+                    for i, start, end, period_df in period_groups:
+                        suffix = csv_period_suffix(i, start, end, group_mode)
+                        with trace_stage(trace, "write_period_csv", rows=len(period_df), files=1) as stage:
+                            if render_cache is not None:
+                                hits = render_cache.hits
+                                archive.write(cached_period_csv(period_df, render_cache), f"{base_filename}_{suffix}.csv")
+                                stage["cached"] = render_cache.hits > hits
+                                continue
+                            with archive.open(f"{base_filename}_{suffix}.csv", "w") as member:
+                                with io.TextIOWrapper(member, encoding="utf-8", newline="") as f:
+                                    write_period_csv(period_df, f)
+            except ReportCancelled:
+                os.remove(output_path)
+                raise
+            return output_path
 
+        written = []
+        try:
+            for i, start, end, period_df in period_groups:
+                suffix = csv_period_suffix(i, start, end, group_mode)
                 filename = os.path.join(output_folder, f"{base_filename}_{suffix}.csv")
-                output_df.to_csv(filename, index=False, header=False)
+                written.append(filename)
+                with trace_stage(trace, "write_period_csv", rows=len(period_df), files=1) as stage:
+                    if render_cache is not None:
+                        hits = render_cache.hits
+                        shutil.copyfile(cached_period_csv(period_df, render_cache), filename)
+                        stage["cached"] = render_cache.hits > hits
+                        continue
+                    with open(filename, "w", encoding="utf-8", newline="", buffering=CSV_BUFFER_SIZE) as f:
+                        write_period_csv(period_df, f)
+        except ReportCancelled:
+            # Leave no half-finished set of period files behind
+            for filename in written:
+                if os.path.exists(filename):
+                    os.remove(filename)
+            raise
 
         return output_folder
 
     # --- EXCEL OUTPUT ---
-    else:
-        from expense_sorter import write_period_sheets
-        with pd.ExcelWriter(output_path, engine='openpyxl') as writer:
-            for i, (start, end) in enumerate(periods, 1):
-                period_df = df[(df["Trans. date"] >= start) & (df["Trans. date"] <= end)]
-                if not period_df.empty:
-                    if group_mode.lower() == "biweekly":
-                        suffix = "First Half" if start.day < 15 else "Second Half"
-                        suffix += f" ({start.strftime('%b %d')} – {end.strftime('%b %d')})"
-                    elif group_mode.lower() == "monthly":
-                        suffix = f"{start.strftime('%B %Y')}"
-                    else:
-                        suffix = f"Week {i} ({start.strftime('%b %d')} – {end.strftime('%b %d')})"
-                    write_period_sheets(period_df, suffix, writer, chart_type)
+    if total < PARALLEL_MIN_PERIODS:
+        period_workers = None
+
+    if workbook_per_period:
+        # One workbook per period next to each other, named like the CSV period files
+        written = []
+
+        def period_path(i, start, end):
+            written.append(os.path.join(output_folder, f"{base_filename}_{csv_period_suffix(i, start, end, group_mode)}.xlsx"))
+            return written[-1]
+
+        try:
+            with trace_stage(trace, "write_period_workbooks", workers=period_workers or 1) as stage:
+                if render_cache is None:
+                    rendered = render_period_workbooks(period_groups, group_mode, chart_type, period_path, period_workers)
+                else:
+                    hits = render_cache.hits
+                    rendered = ((shutil.copyfile(path, period_path(i, start, end)), sheet_names) for i, start, end, path, sheet_names
+                                in cached_period_workbooks(period_groups, group_mode, chart_type, render_cache, period_workers))
+                for *_, sheet_names in rendered:
+                    stage["files"] = stage.get("files", 0) + 1
+                    stage["sheets"] = stage.get("sheets", 0) + len(sheet_names)
+                if render_cache is not None:
+                    stage["cached"] = render_cache.hits - hits
+        except ReportCancelled:
+            for filename in written:
+                if os.path.exists(filename):
+                    os.remove(filename)
+            raise
+        return output_folder
+
+    if render_cache is not None:
+        # Every period comes from its own workbook in the cache, rendered there first if it is new
+        with trace_stage(trace, "write_period_workbooks", workers=period_workers or 1) as stage:
+            hits = render_cache.hits
+            parts = [(path, excel_period_suffix(i, start, end, group_mode), sheet_names)
+                     for i, start, end, path, sheet_names in
+                     cached_period_workbooks(period_groups, group_mode, chart_type, render_cache, period_workers)]
+            stage["files"] = len(parts)
+            stage["cached"] = render_cache.hits - hits
+        with trace_stage(trace, "assemble", files=len(parts)) as stage:
+            stage["sheets"] = assemble_period_workbooks(parts, output_path)
+        return output_path
 
+    if period_workers and period_workers > 1:
+        # Periods render into workbooks of their own in worker processes and are then stitched together
+        parts_folder = tempfile.mkdtemp(prefix="expense_wizard_periods_")
+        try:
+            with trace_stage(trace, "write_period_workbooks", workers=period_workers) as stage:
+                parts = list(render_period_workbooks(period_groups, group_mode, chart_type,
+                                                     lambda i, start, end: os.path.join(parts_folder, f"period_{i}.xlsx"),
+                                                     period_workers))
+                stage["files"] = len(parts)
+            with trace_stage(trace, "assemble", files=len(parts)) as stage:
+                stage["sheets"] = assemble_period_workbooks(parts, output_path)
+        finally:
+            shutil.rmtree(parts_folder, ignore_errors=True)
         return output_path
 
+    # Write-only mode streams each sheet to disk instead of keeping every cell in memory
+    wb = Workbook(write_only=True)
+    try:
+        for i, start, end, period_df in period_groups:
+            suffix = excel_period_suffix(i, start, end, group_mode)
+            with trace_stage(trace, "write_period_sheets", rows=len(period_df)) as stage:
+                stage["sheets"] = len(write_period_sheets(period_df, suffix, wb, chart_type, trace))
+    except ReportCancelled:
+        discard_workbook(wb)
+        raise
+    # Nothing reaches output_path until every period has rendered
+    with trace_stage(trace, "save"):
+        wb.save(output_path)
+
+    return output_path
+
+
+def main_processing_function(folder_path, start_date, end_date, output_folder=None, group_mode="Monthly", use_csv=False, chart_type = "Pie",
+                             use_cache=True, rebuild_cache=False, cache_dir=None, workers=None, log=None,
+                             csv_archive=False, progress=None, cancel_event=None, incremental=False,
+                             store_path=None, deduplicate=True, trace=None, compact=False, streaming=False,
+                             chunk_size=None, period_workers=None, workbook_per_period=False, category_rules=None,
+                             summary_only=False, render_cache=None, columnar_format=None):
+    import pandas as pd
+    import os
+
+    start_date = pd.to_datetime(start_date)
+    end_date = pd.to_datetime(end_date)
+
+    if incremental and csv_archive:
+        raise ValueError("Incremental updates are not supported for CSV archives.")
+    if streaming and (incremental or store_path):
+        raise ValueError("Streaming ingestion cannot be combined with incremental updates or the transaction store.")
+    if incremental and workbook_per_period:
+        raise ValueError("Incremental updates are not supported for one workbook per period.")
+    if summary_only and (use_csv or incremental or streaming or workbook_per_period):
+        raise ValueError("Summary-only reports are single Excel workbooks and cannot be streamed or updated incrementally.")
+    if columnar_format:
+        if columnar_format not in COLUMNAR_FORMATS:
+            raise ValueError(f"Unsupported columnar format: {columnar_format}")
+        if use_csv or incremental or workbook_per_period or summary_only:
+            raise ValueError("Parquet and Arrow exports are written in full and cannot be combined with CSV, incremental, "
+                             "per-period workbook or summary-only reports.")
+        # Fails before anything is loaded when pyarrow is missing
+        import_pyarrow()
+
+    # Output folder logic
+    if not output_folder:
+        output_folder = os.path.join(folder_path, "CleanStatementsCSV" if use_csv else "CleanStatements")
+    os.makedirs(output_folder, exist_ok=True)
+
+    # Base file name
+    base_filename = report_base_filename(start_date, end_date, group_mode)
+    extension = columnar_format or (("zip" if csv_archive else "csv") if use_csv else "xlsx")
+
+    # Resolve filename conflicts; incremental runs update the existing report instead
+    if incremental:
+        output_path = os.path.join(output_folder, f"{base_filename}.{extension}")
+    else:
+        output_path = resolve_output_path(output_folder, base_filename, extension)
+
+    # Every stage below is timed when a ReportTrace is attached
+    with trace_stage(trace, "report", group_mode=group_mode, format=extension, chart_type=chart_type):
+        # Load Discover .xlsx files
+        file_list = list_statement_files(folder_path)
+
+        if incremental:
+            manifest = ReportManifest(output_folder)
+            key = report_key(start_date, group_mode, extension)
+            previous = manifest.get(key)
+            sources = source_fingerprints(folder_path, file_list, cache_dir)
+            rules = category_rules.fingerprint if category_rules else None
+            # Loading options that change which rows or values a period holds
+            settings = {"deduplicate": deduplicate, "compact": compact}
+            if report_is_current(previous, output_folder, sources, end_date, chart_type, use_csv, rules, settings):
+                if log:
+                    log("Report is already up to date")
+                return output_folder if use_csv else previous["output_path"]
+
+        if summary_only:
+            with trace_stage(trace, "load") as stage:
+                cube = load_category_cube(folder_path, file_list, use_cache, rebuild_cache, cache_dir, workers, log, progress,
+                                          cancel_event, deduplicate, trace, compact, category_rules)
+                stage["days"] = cube.days
+            periods = build_periods(start_date, end_date, group_mode)
+            with trace_stage(trace, "render", periods=len(periods)):
+                return render_summary_report(cube, periods, group_mode, chart_type, output_path, progress, cancel_event,
+                                             trace)
+
+        if streaming:
+            # Memory stays bounded by the chunk size and the largest period, however big the statements are
+            periods = build_periods(start_date, end_date, group_mode)
+            hits = render_cache.hits if render_cache else 0
+            result = stream_report(folder_path, file_list, periods, group_mode, use_csv, chart_type, csv_archive,
+                                   output_folder, base_filename, output_path, chunk_size, deduplicate, compact, log, progress,
+                                   cancel_event, trace, period_workers, workbook_per_period, category_rules, render_cache,
+                                   columnar_format)
+            trim_render_cache(render_cache, hits, log)
+            return result
+
+        with trace_stage(trace, "load") as stage:
+            df = load_transactions(folder_path, file_list, start_date, end_date, use_cache, rebuild_cache, cache_dir, workers,
+                                   log, progress, cancel_event, store_path, deduplicate, trace, compact)
+            stage["rows"] = len(df)
+
+        if df.empty:
+            raise NoTransactionsFound("No transactions found in the selected date range.")
+        df = categorize_transactions(df, category_rules, trace)
+
+        with trace_stage(trace, "periods") as stage:
+            periods = build_periods(start_date, end_date, group_mode)
+            stage["periods"] = len(periods)
+
+        if incremental:
+            with trace_stage(trace, "update", rows=len(df)):
+                planned = plan_report_periods(df, periods, group_mode, use_csv, previous, settings)
+                if use_csv:
+                    result = update_csv_reports(df, periods, planned, previous, output_folder, base_filename, log, progress,
+                                                cancel_event)
+                else:
+                    result = update_excel_report(df, periods, planned, previous, output_path, chart_type, log, progress,
+                                                 cancel_event)
+            manifest.put(key, {
+                "output_path": output_path,
+                "end_date": end_date.strftime("%Y-%m-%d"),
+                "chart_type": chart_type,
+                "sources": sources,
+                "rules": rules,
+                "settings": settings,
+                "periods": planned
+            })
+            manifest.save()
+            return result
+
+        hits = render_cache.hits if render_cache else 0
+        with trace_stage(trace, "render", rows=len(df)):
+            result = render_report(df, periods, group_mode, use_csv, chart_type, csv_archive, output_folder, base_filename,
+                                   output_path, progress, cancel_event, trace, period_workers, workbook_per_period,
+                                   render_cache, columnar_format)
+        trim_render_cache(render_cache, hits, log)
+        return result
+
+
+def trim_render_cache(render_cache, hits=0, log=None):
+    # Once a report is written, so the periods it just used are the last ones evicted
+    if not render_cache:
+        return
+    if log and render_cache.hits > hits:
+        log(f"Reused {render_cache.hits - hits} rendered periods")
+    render_cache.trim()
+
+
+# Export format name -> (use_csv, csv_archive, columnar_format)
+REPORT_FORMATS = {"xlsx": (False, False, None), "csv": (True, False, None), "zip": (True, True, None),
+                  "parquet": (False, False, "parquet"), "arrow": (False, False, "arrow")}
+
+
+def report_job_format(job):
+    # "CSV", ".csv" and "csv" name the same format
+    extension = job.get("format", "xlsx").lower().lstrip(".")
+    if extension not in REPORT_FORMATS:
+        raise ValueError(f"Unsupported report format: {extension}")
+    return extension
+
+
+def plan_report_job(job, folder_path, output_folder=None, reserved=None):
+    # A job is a dict with start_date, end_date and optional group_mode, format, chart_type and output_folder
+    start_date = pd.to_datetime(job["start_date"])
+    end_date = pd.to_datetime(job["end_date"])
+    if end_date < start_date:
+        raise ValueError(f"Report ends before it starts: {job['start_date']} to {job['end_date']}")
+    group_mode = job.get("group_mode", "Monthly")
+    extension = report_job_format(job)
+    use_csv, csv_archive, columnar_format = REPORT_FORMATS[extension]
+    if columnar_format:
+        import_pyarrow()
+
+    job_folder = job.get("output_folder") or output_folder
+    if not job_folder:
+        job_folder = os.path.join(folder_path, "CleanStatementsCSV" if use_csv else "CleanStatements")
+    os.makedirs(job_folder, exist_ok=True)
+
+    base_filename = report_base_filename(start_date, end_date, group_mode)
+    output_path = resolve_output_path(job_folder, base_filename, extension, reserved or ())
+    if reserved is not None:
+        reserved.add(output_path)
+
+    return {
+        "start_date": start_date,
+        "end_date": end_date,
+        "group_mode": group_mode,
+        "use_csv": use_csv,
+        "csv_archive": csv_archive,
+        "columnar_format": columnar_format,
+        "chart_type": job.get("chart_type", "Pie"),
+        "output_folder": job_folder,
+        "base_filename": base_filename,
+        "output_path": output_path,
+        # Built up front so a bad group_mode fails before anything is loaded
+        "periods": build_periods(start_date, end_date, group_mode),
+    }
+
+
+def report_output_name(plan, workbook_per_period=False):
+    # For the log: CSV reports outside a zip, and workbooks split by period, are a set of
+    # <base filename>_<period> files in the output folder rather than the file at output_path
+    if plan["use_csv"] and not plan["csv_archive"]:
+        return f"{plan['base_filename']}_*.csv"
+    if workbook_per_period and not plan["use_csv"] and not plan["columnar_format"]:
+        return f"{plan['base_filename']}_*.xlsx"
+    return os.path.basename(plan["output_path"])
+
+
+def render_report_job(df, plan, trace=None, period_workers=None, workbook_per_period=False, render_cache=None):
+    # Returns (output path, seconds, render cache hits). In a worker process the hits land on a copy of
+    # the cache, so the parent adds them up
+    started = time.perf_counter()
+    hits = render_cache.hits if render_cache else 0
+    result = render_report(df, plan["periods"], plan["group_mode"], plan["use_csv"], plan["chart_type"], plan["csv_archive"],
+                           plan["output_folder"], plan["base_filename"], plan["output_path"], trace=trace,
+                           period_workers=period_workers, workbook_per_period=workbook_per_period, render_cache=render_cache,
+                           columnar_format=plan["columnar_format"])
+    return result, time.perf_counter() - started, (render_cache.hits - hits if render_cache else 0)
+
+
+def stream_report_jobs(folder_path, plans, chunk_size=None, deduplicate=True, compact=False, log=None, trace=None,
+                       period_workers=None, workbook_per_period=False, category_rules=None, render_cache=None):
+    # Streamed jobs each re-read the statements, trading the shared load for memory that stays flat
+    file_list = list_statement_files(folder_path)
+    results = [None] * len(plans)
+    hits = render_cache.hits if render_cache else 0
+    with trace_stage(trace, "batch", jobs=len(plans)):
+        for index, plan in enumerate(plans):
+            started = time.perf_counter()
+            try:
+                results[index] = stream_report(folder_path, file_list, plan["periods"], plan["group_mode"], plan["use_csv"],
+                                               plan["chart_type"], plan["csv_archive"], plan["output_folder"],
+                                               plan["base_filename"], plan["output_path"], chunk_size, deduplicate, compact,
+                                               log, trace=trace, period_workers=period_workers,
+                                               workbook_per_period=workbook_per_period, category_rules=category_rules,
+                                               render_cache=render_cache, columnar_format=plan["columnar_format"])
+            except NoTransactionsFound:
+                if log:
+                    log(f"Skipped {plan['base_filename']}: no transactions found in the selected date range")
+                continue
+            if log:
+                log(f"Rendered {report_output_name(plan, workbook_per_period)} in {time.perf_counter() - started:.2f}s")
+    trim_render_cache(render_cache, hits, log)
+    return results
+
+
+def summary_report_jobs(folder_path, plans, use_cache=True, rebuild_cache=False, cache_dir=None, workers=None, log=None,
+                        deduplicate=True, trace=None, compact=False, category_rules=None):
+    # Every job is answered from one category cube; only its summary sheets are written
+    if any(plan["use_csv"] or plan["columnar_format"] for plan in plans):
+        raise ValueError("Summary-only reports are Excel only.")
+    results = [None] * len(plans)
+    with trace_stage(trace, "batch", jobs=len(plans)):
+        file_list = list_statement_files(folder_path)
+        with trace_stage(trace, "load") as stage:
+            cube = load_category_cube(folder_path, file_list, use_cache, rebuild_cache, cache_dir, workers, log,
+                                      deduplicate=deduplicate, trace=trace, compact=compact, category_rules=category_rules)
+            stage["days"] = cube.days
+        for index, plan in enumerate(plans):
+            started = time.perf_counter()
+            try:
+                with trace_stage(trace, "render", output=report_output_name(plan)):
+                    results[index] = render_summary_report(cube, plan["periods"], plan["group_mode"], plan["chart_type"],
+                                                           plan["output_path"], trace=trace)
+            except NoTransactionsFound:
+                if log:
+                    log(f"Skipped {plan['base_filename']}: no transactions found in the selected date range")
+                continue
+            if log:
+                log(f"Rendered {report_output_name(plan)} in {time.perf_counter() - started:.2f}s")
+    return results
+
+
+def run_report_jobs(folder_path, jobs, output_folder=None, render_workers=None, use_cache=True, rebuild_cache=False,
+                    cache_dir=None, workers=None, log=None, store_path=None, deduplicate=True, trace=None, compact=False,
+                    streaming=False, chunk_size=None, period_workers=None, workbook_per_period=False, category_rules=None,
+                    summary_only=False, render_cache=None):
+    # Loads the statements once for the union of all date ranges and renders every job from that frame.
+    # Returns one output path per job, or None for a job with no transactions in its range
+    if not jobs:
+        raise ValueError("No report jobs given.")
+    parallel = (render_workers or 1) > 1
+    if summary_only and (streaming or store_path or parallel or workbook_per_period or render_cache is not None):
+        raise ValueError("Summary-only reports are answered from saved category totals and cannot be combined with "
+                         "streaming, the transaction store, parallel reports, per-period workbooks or the render cache.")
+    if streaming and (store_path or parallel):
+        raise ValueError("Streamed reports re-read the statements one job at a time and cannot be combined with the "
+                         "transaction store or parallel reports.")
+    reserved = set()
+    plans = [plan_report_job(job, folder_path, output_folder, reserved) for job in jobs]
+    if summary_only:
+        return summary_report_jobs(folder_path, plans, use_cache, rebuild_cache, cache_dir, workers, log, deduplicate, trace,
+                                   compact, category_rules)
+    if streaming:
+        return stream_report_jobs(folder_path, plans, chunk_size, deduplicate, compact, log, trace, period_workers,
+                                  workbook_per_period, category_rules, render_cache)
+
+    with trace_stage(trace, "batch", jobs=len(plans)):
+        file_list = list_statement_files(folder_path)
+        start_date = min(plan["start_date"] for plan in plans)
+        end_date = max(plan["end_date"] for plan in plans)
+        with trace_stage(trace, "load") as stage:
+            df = load_transactions(folder_path, file_list, start_date, end_date, use_cache, rebuild_cache, cache_dir, workers,
+                                   log, store_path=store_path, deduplicate=deduplicate, trace=trace, compact=compact)
+            stage["rows"] = len(df)
+        df = categorize_transactions(df, category_rules, trace)
+
+        pending = []
+        results = [None] * len(plans)
+        for index, plan in enumerate(plans):
+            job_df = in_date_range(df, plan["start_date"], plan["end_date"])
+            if job_df.empty:
+                if log:
+                    log(f"Skipped {plan['base_filename']}: no transactions found in the selected date range")
+                continue
+            pending.append((index, job_df))
+
+        def finished(index, result, elapsed):
+            results[index] = result
+            if log:
+                log(f"Rendered {report_output_name(plans[index], workbook_per_period)} in {elapsed:.2f}s")
+
+        hits = render_cache.hits if render_cache else 0
+        render_workers = min(render_workers or 1, len(pending))
+        if render_workers > 1:
+            # Each worker receives only its job's slice of the shared frame; workers are timed as one stage
+            with trace_stage(trace, "render", files=len(pending)) as stage:
+                executor = ProcessPoolExecutor(max_workers=render_workers)
+                try:
+                    # Reports already render side by side, so their periods render serially
+                    futures = {executor.submit(render_report_job, job_df, plans[index], None, None, workbook_per_period,
+                                               render_cache): index
+                               for index, job_df in pending}
+                    for future in as_completed(futures):
+                        result, elapsed, reused = future.result()
+                        if render_cache is not None:
+                            render_cache.hits += reused
+                        finished(futures[future], result, elapsed)
+                finally:
+                    executor.shutdown(cancel_futures=True)
+                if render_cache is not None:
+                    stage["cached"] = render_cache.hits - hits
+        else:
+            for index, job_df in pending:
+                with trace_stage(trace, "render", rows=len(job_df), output=report_output_name(plans[index], workbook_per_period)):
+                    result, elapsed, _ = render_report_job(job_df, plans[index], trace, period_workers, workbook_per_period,
+                                                           render_cache)
+                    finished(index, result, elapsed)
 
+        trim_render_cache(render_cache, hits, log)
+        return results
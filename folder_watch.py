@@ -0,0 +1,271 @@
+import os
+import sys
+import time
+import select
+import struct
+import ctypes
+import ctypes.util
+import threading
+from contextlib import nullcontext
+from expense_sorter import (REPORT_FORMATS, ReportCancelled, ingest_statements, list_statement_files, load_category_cube,
+                            main_processing_function, report_job_format)
+from statement_formats import STATEMENT_EXTENSIONS, detect_statement_format
+from transaction_store import TransactionStore
+
+
+# A changed file is ingested once its size and mtime have held still this long, so statements still
+# being copied or downloaded into the folder are not parsed half-written
+SETTLE_SECONDS = 2.0
+# How often the folder is re-scanned when inotify is not available
+POLL_SECONDS = 1.0
+
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+EVENT_HEADER = struct.Struct("iIII")
+
+
+def is_statement_name(name):
+    # Skips Excel's ~$ lock files and hidden files such as the cache and the transaction store
+    return name.lower().endswith(STATEMENT_EXTENSIONS) and not name.startswith(("~$", "."))
+
+
+def scan_folder(folder_path):
+    snapshot = {}
+    with os.scandir(folder_path) as entries:
+        for entry in entries:
+            if is_statement_name(entry.name) and entry.is_file():
+                stat = entry.stat()
+                snapshot[entry.name] = (stat.st_size, stat.st_mtime_ns)
+    return snapshot
+
+
+class InotifyWatcher:
+    # Linux only: the kernel reports every file created, written, moved or deleted in the folder
+    def __init__(self, folder_path):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        if libc.inotify_add_watch(self.fd, os.fsencode(folder_path), WATCH_MASK) < 0:
+            error = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(error, f"Cannot watch {folder_path}")
+
+    def wait(self, timeout):
+        # Names of the files that changed, or an empty set once timeout seconds pass without a change
+        if not select.select([self.fd], [], [], timeout)[0]:
+            return set()
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return set()
+        names = set()
+        offset = 0
+        while offset + EVENT_HEADER.size <= len(data):
+            _, _, _, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = data[offset:offset + length].split(b"\0", 1)[0]
+            offset += length
+            if name:
+                names.add(os.fsdecode(name))
+        return names
+
+    def close(self):
+        os.close(self.fd)
+
+
+class PollingWatcher:
+    # Fallback for Windows, macOS and network shares: compares directory listings
+    def __init__(self, folder_path):
+        self.folder_path = folder_path
+        self.snapshot = scan_folder(folder_path)
+
+    def wait(self, timeout):
+        time.sleep(min(timeout, POLL_SECONDS))
+        snapshot = scan_folder(self.folder_path)
+        changed = {name for name in snapshot.keys() | self.snapshot.keys() if snapshot.get(name) != self.snapshot.get(name)}
+        self.snapshot = snapshot
+        return changed
+
+    def close(self):
+        pass
+
+
+def open_watcher(folder_path, polling=False):
+    if not polling and sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher(folder_path)
+        except (OSError, AttributeError):
+            pass
+    return PollingWatcher(folder_path)
+
+
+class FolderWatchService:
+    # Watches the statement folder on a background thread and ingests new or changed statements as soon
+    # as they settle: they are parsed into the statement cache (and the transaction store when store_path
+    # is set) and the daily category totals are rebuilt, so the next report or preview starts warm.
+    # standing_reports is a list of jobs like expense_cli's (start_date, end_date, group_mode, format,
+    # chart_type, output_folder) kept up to date in place after every ingest. on_ingested(cube) is called
+    # from the service thread. lock is held while the cache is being written, so an application running
+    # its own reports can keep the two apart
+    def __init__(self, folder_path, standing_reports=None, output_folder=None, store_path=None, category_rules=None,
+                 rules_loader=None, workers=None, log=None, on_ingested=None, lock=None, settle_seconds=SETTLE_SECONDS, polling=False):
+        for job in standing_reports or []:
+            extension = report_job_format(job)
+            if extension not in ("xlsx", "csv"):
+                raise ValueError(f"Standing reports are updated in place, which {extension} exports do not support.")
+        self.folder_path = folder_path
+        self.standing_reports = list(standing_reports or [])
+        self.output_folder = output_folder
+        self.store_path = store_path
+        self.category_rules = category_rules
+        # Called on the service thread for the categorization rules, for callers that should not parse them
+        self.rules_loader = rules_loader
+        self.workers = workers
+        self.log = log
+        self.on_ingested = on_ingested
+        self.lock = lock
+        self.settle_seconds = settle_seconds
+        self.polling = polling
+        self.cube = None
+        self.known = {}
+        # Set once a settled file turns out to differ from what was last ingested
+        self.changed = False
+        self.stop_event = threading.Event()
+        self.thread = None
+        # Set when the service thread itself failed and stopped watching
+        self.error = None
+
+    def start(self):
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self.run, name="expense-wizard-watch", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        # Interrupts an ingest in progress; whatever was parsed so far stays in the cache
+        self.stop_event.set()
+        if self.thread:
+            self.thread.join()
+            self.thread = None
+
+    def run(self):
+        try:
+            watcher = open_watcher(self.folder_path, self.polling)
+        except Exception as e:
+            self.failed(e)
+            return
+        if self.log:
+            self.log(f"Watching {self.folder_path} ({'inotify' if isinstance(watcher, InotifyWatcher) else 'polling'})")
+        try:
+            if self.rules_loader:
+                self.category_rules = self.rules_loader()
+            self.ingest()
+            pending = {}
+            while not self.stop_event.is_set():
+                changed = watcher.wait(0.5 if pending else 1.0)
+                for name in changed:
+                    if is_statement_name(name):
+                        pending[name] = None
+                if pending and self.settle(pending):
+                    self.ingest()
+        except Exception as e:
+            self.failed(e)
+        finally:
+            watcher.close()
+
+    def failed(self, error):
+        self.error = error
+        if self.log:
+            self.log(f"Stopped watching {self.folder_path}: {error}")
+
+    def settle(self, pending):
+        # Drops the files that held still for settle_seconds from pending; True when all of them have
+        # and at least one recognized statement was added, changed or removed
+        now = time.monotonic()
+        for name in list(pending):
+            path = os.path.join(self.folder_path, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                del pending[name]
+                self.changed = self.changed or name in self.known
+                continue
+            signature = (stat.st_size, stat.st_mtime_ns)
+            if pending[name] is None or pending[name][0] != signature:
+                pending[name] = (signature, now)
+                continue
+            if now - pending[name][1] < self.settle_seconds:
+                continue
+            del pending[name]
+            try:
+                recognized = detect_statement_format(path)
+            except OSError:
+                # Removed between the two looks
+                recognized = None
+            if recognized:
+                self.changed = self.changed or self.known.get(name) != signature
+            else:
+                # Not a statement, or not one any more; reports written into the folder end up here
+                self.changed = self.changed or name in self.known
+        return self.changed and not pending
+
+    def ingest(self):
+        # Listed before parsing, so a file that changes while it is being parsed still counts as changed
+        self.changed = False
+        snapshot = scan_folder(self.folder_path)
+        try:
+            file_list = list_statement_files(self.folder_path)
+        except FileNotFoundError as e:
+            self.known = {}
+            if self.log:
+                self.log(str(e))
+            return
+        started = time.perf_counter()
+        try:
+            with self.lock or nullcontext():
+                if self.store_path:
+                    with TransactionStore(self.store_path) as store:
+                        ingest_statements(store, self.folder_path, file_list, self.workers, self.log,
+                                          cancel_event=self.stop_event)
+                self.cube = load_category_cube(self.folder_path, file_list, workers=self.workers, log=self.log,
+                                               cancel_event=self.stop_event, category_rules=self.category_rules)
+                self.known = {name: snapshot[name] for name in file_list if name in snapshot}
+                if self.log:
+                    self.log(f"Ingested {len(file_list)} statements in {time.perf_counter() - started:.2f}s")
+                for job in self.standing_reports:
+                    self.update_standing_report(job)
+        except ReportCancelled:
+            return
+        except Exception as e:
+            # Most often a statement that cannot be read yet; the next change in the folder tries again
+            if self.log:
+                self.log(f"Ingest failed: {e}")
+            return
+        if self.on_ingested:
+            self.on_ingested(self.cube)
+
+    def update_standing_report(self, job):
+        use_csv = REPORT_FORMATS[report_job_format(job)][0]
+        try:
+            path = main_processing_function(
+                self.folder_path, job["start_date"], job["end_date"], job.get("output_folder") or self.output_folder,
+                job.get("group_mode", "Monthly"), use_csv, job.get("chart_type", "Pie"), workers=self.workers,
+                log=self.log, cancel_event=self.stop_event, incremental=True, store_path=self.store_path,
+                category_rules=self.category_rules)
+        except ReportCancelled:
+            raise
+        except Exception as e:
+            # Includes a range with no transactions yet, or a report file left damaged by a sync or a crash;
+            # the report is tried again after the next ingest
+            if self.log:
+                self.log(f"Standing report {job['start_date']} to {job['end_date']} not updated: {e}")
+            return
+        if self.log:
+            self.log(f"Standing report updated: {path}")
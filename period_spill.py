@@ -0,0 +1,39 @@
+import os
+import pickle
+import shutil
+import tempfile
+import pandas as pd
+
+
+class PeriodSpill:
+    # Rows bucketed by period label in a temporary folder, so a streamed report only holds
+    # the period being rendered in memory. Each bucket is a file of appended pickled chunks.
+    def __init__(self, spill_dir=None):
+        self.spill_dir = tempfile.mkdtemp(prefix="expense_wizard_spill_", dir=spill_dir)
+
+    def close(self):
+        shutil.rmtree(self.spill_dir, ignore_errors=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def bucket_path(self, label):
+        return os.path.join(self.spill_dir, f"period_{label}.pkl")
+
+    def append(self, label, df):
+        with open(self.bucket_path(label), "ab") as f:
+            pickle.dump(df, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def read(self, label):
+        # Chunks come back in the order they were appended
+        frames = []
+        with open(self.bucket_path(label), "rb") as f:
+            while True:
+                try:
+                    frames.append(pickle.load(f))
+                except EOFError:
+                    break
+        return pd.concat(frames, ignore_index=True)
@@ -0,0 +1,87 @@
+import os
+import json
+import shutil
+import hashlib
+import tempfile
+from report_manifest import period_fingerprint
+
+
+# Bumped whenever period sheets or CSV files are rendered differently, so older outputs are not reused
+RENDER_CACHE_VERSION = 1
+RENDER_CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+
+class RenderCache:
+    # Rendered period outputs (a one-period workbook or a period CSV) stored under a hash of the period's
+    # transactions and every setting that shapes the output. Least recently used files are evicted once
+    # the folder grows past max_bytes
+    def __init__(self, cache_dir, max_bytes=RENDER_CACHE_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, period_df, **settings):
+        text = json.dumps({"version": RENDER_CACHE_VERSION, "settings": settings}, sort_keys=True)
+        return hashlib.sha1((period_fingerprint(period_df) + text).encode("utf-8")).hexdigest()
+
+    def entry_path(self, key, extension):
+        return os.path.join(self.cache_dir, f"{key}.{extension}")
+
+    def fetch(self, key, extension):
+        # Path of the cached output, or None. A hit counts as a use for eviction
+        path = self.entry_path(key, extension)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        self.hits += 1
+        return path
+
+    def scratch_dir(self):
+        # For outputs still being rendered; on the cache's file system so store() can move them in
+        os.makedirs(self.cache_dir, exist_ok=True)
+        return tempfile.mkdtemp(prefix="rendering_", dir=self.cache_dir)
+
+    def store(self, key, extension, path):
+        # Moves a freshly rendered output into the cache and returns its new path
+        self.misses += 1
+        entry_path = self.entry_path(key, extension)
+        os.replace(path, entry_path)
+        return entry_path
+
+    def render(self, key, extension, write):
+        # Cached output for key, produced by write(path) first when there is none
+        path = self.fetch(key, extension)
+        if path:
+            return path
+        scratch = self.scratch_dir()
+        try:
+            path = os.path.join(scratch, f"output.{extension}")
+            write(path)
+            return self.store(key, extension, path)
+        finally:
+            shutil.rmtree(scratch, ignore_errors=True)
+
+    def trim(self):
+        # Evicts least recently used outputs until the cache fits in max_bytes; returns how many were removed
+        try:
+            entries = [entry for entry in os.scandir(self.cache_dir) if entry.is_file()]
+        except FileNotFoundError:
+            return 0
+        entries = [(entry.stat().st_mtime_ns, entry.stat().st_size, entry.path) for entry in entries]
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        return removed
+
+    def clear(self):
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
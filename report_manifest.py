@@ -0,0 +1,49 @@
+import os
+import json
+import hashlib
+import pandas as pd
+
+
+MANIFEST_VERSION = 1
+MANIFEST_FILENAME = ".expense_wizard_reports.json"
+
+
+def period_fingerprint(period_df):
+    # Row hashes in order, so any added, removed or edited transaction changes the fingerprint
+    hashed = pd.util.hash_pandas_object(period_df, index=False)
+    return hashlib.sha1(hashed.to_numpy().tobytes()).hexdigest()
+
+
+def report_key(start_date, group_mode, extension):
+    # The end date is left out so a report can grow as new statements arrive
+    return f"{start_date.strftime('%Y-%m-%d')}_{group_mode.lower()}_{extension}"
+
+
+class ReportManifest:
+    def __init__(self, output_folder):
+        self.path = os.path.join(output_folder, MANIFEST_FILENAME)
+        self.reports = {}
+        self.load()
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r") as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return
+        if manifest.get("version") == MANIFEST_VERSION:
+            self.reports = manifest.get("reports", {})
+
+    def save(self):
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"version": MANIFEST_VERSION, "reports": self.reports}, f, indent=1)
+        os.replace(tmp_path, self.path)
+
+    def get(self, key):
+        return self.reports.get(key)
+
+    def put(self, key, entry):
+        self.reports[key] = entry
@@ -0,0 +1,37 @@
+import os
+import sys
+import hashlib
+
+
+# Only the standard library here: the GUI resolves these paths on its own thread, before the report
+# pipeline (pandas, numpy) has finished importing in the background
+CACHE_APPNAME = "ExpenseWizard"
+STORE_FILENAME = ".expense_wizard_transactions.sqlite"
+RENDER_CACHE_DIRNAME = "renders"
+
+
+def user_cache_root():
+    # Cache entries are unpickled, so they live where only this user can write, never in the statement
+    # folder itself: that folder may be a share other people can write to
+    if os.name == "nt":
+        base = os.environ.get("LOCALAPPDATA") or os.path.join(os.path.expanduser("~"), "AppData", "Local")
+    elif sys.platform == "darwin":
+        base = os.path.join(os.path.expanduser("~"), "Library", "Caches")
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, CACHE_APPNAME)
+
+
+def default_cache_dir(folder_path):
+    # One cache per statement folder
+    key = hashlib.sha1(os.path.normcase(os.path.abspath(folder_path)).encode("utf-8")).hexdigest()[:16]
+    return os.path.join(user_cache_root(), key)
+
+
+def default_render_cache_dir(cache_dir):
+    # Inside the statement cache folder
+    return os.path.join(cache_dir, RENDER_CACHE_DIRNAME)
+
+
+def default_store_path(folder_path):
+    return os.path.join(folder_path, STORE_FILENAME)
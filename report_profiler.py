@@ -0,0 +1,133 @@
+import io
+import json
+import time
+import pstats
+import cProfile
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+
+
+TRACE_VERSION = 1
+TRACE_FILENAME = "expense_wizard_trace.json"
+
+
+class ReportTrace:
+    # Collects one record per pipeline stage: wall time, peak traced memory and whatever counts
+    # the stage reports (rows, sheets, files...). on_stage is called with each record as it finishes.
+    def __init__(self, on_stage=None, track_memory=True, profile=False):
+        self.on_stage = on_stage
+        self.track_memory = track_memory
+        self.profiler = cProfile.Profile() if profile else None
+        self.records = []
+        self.stack = []
+        self.started = None
+        self.owns_tracemalloc = False
+
+    def begin(self):
+        if self.started is None:
+            self.started = time.perf_counter()
+        if self.track_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self.owns_tracemalloc = True
+        if self.profiler:
+            self.profiler.enable()
+
+    def end(self):
+        if self.profiler:
+            self.profiler.disable()
+        # Tracing slows every allocation, so it only runs while a stage is open
+        if self.owns_tracemalloc:
+            tracemalloc.stop()
+            self.owns_tracemalloc = False
+
+    @contextmanager
+    def stage(self, name, **info):
+        if not self.stack:
+            self.begin()
+        record = {"name": name, "path": "/".join([r["name"] for r in self.stack] + [name]), "depth": len(self.stack)}
+        record.update(info)
+        if self.track_memory:
+            # The peak is global, so the parent keeps what it reached before the child resets it
+            if self.stack:
+                self.note_peak(self.stack[-1])
+            tracemalloc.reset_peak()
+        self.stack.append(record)
+        started = time.perf_counter()
+        record["start"] = started - self.started
+        try:
+            yield record
+        except BaseException as e:
+            record["error"] = type(e).__name__
+            raise
+        finally:
+            record["seconds"] = time.perf_counter() - started
+            self.stack.pop()
+            if self.track_memory:
+                self.note_peak(record)
+                if self.stack:
+                    self.stack[-1]["peak_memory"] = max(self.stack[-1].get("peak_memory", 0), record["peak_memory"])
+            self.records.append(record)
+            if not self.stack:
+                self.end()
+            if self.on_stage:
+                self.on_stage(record)
+
+    def note_peak(self, record):
+        record["peak_memory"] = max(record.get("peak_memory", 0), tracemalloc.get_traced_memory()[1])
+
+    def ordered_records(self):
+        return sorted(self.records, key=lambda r: r["start"])
+
+    def totals(self):
+        # Records with the same path (one per period, say) folded into one row, in first-start order
+        totals = {}
+        for record in self.ordered_records():
+            total = totals.setdefault(record["path"], {"name": record["name"], "depth": record["depth"], "calls": 0,
+                                                       "seconds": 0.0})
+            total["calls"] += 1
+            total["seconds"] += record["seconds"]
+            if "peak_memory" in record:
+                total["peak_memory"] = max(total.get("peak_memory", 0), record["peak_memory"])
+            for key in ("rows", "sheets", "files", "periods"):
+                if key in record:
+                    total[key] = total.get(key, 0) + record[key]
+        return totals
+
+    def summary(self):
+        lines = []
+        for total in self.totals().values():
+            label = "  " * total["depth"] + total["name"]
+            if total["calls"] > 1:
+                label += f" x{total['calls']}"
+            parts = [f"{label:<32}", f"{total['seconds']:8.2f}s"]
+            for key in ("rows", "sheets", "files", "periods"):
+                if key in total:
+                    parts.append(f"{total[key]} {key}")
+            if "peak_memory" in total:
+                parts.append(f"peak {total['peak_memory'] / (1024 * 1024):.1f} MB")
+            lines.append("  ".join(parts))
+        return "\n".join(lines)
+
+    def save(self, path):
+        trace = {"version": TRACE_VERSION, "stages": self.ordered_records()}
+        with open(path, "w") as f:
+            json.dump(trace, f, indent=1, default=str)
+
+    def profile_summary(self, limit=20, sort="cumulative"):
+        if not self.profiler:
+            return ""
+        out = io.StringIO()
+        pstats.Stats(self.profiler, stream=out).sort_stats(sort).print_stats(limit)
+        return out.getvalue()
+
+    def save_profile(self, path):
+        # Readable with pstats or snakeviz
+        if self.profiler:
+            self.profiler.dump_stats(path)
+
+
+def trace_stage(trace, name, **info):
+    # Stages are free when no trace is attached; the yielded dict just collects nothing
+    if trace is None:
+        return nullcontext({})
+    return trace.stage(name, **info)
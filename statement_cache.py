@@ -0,0 +1,133 @@
+import os
+import json
+import hashlib
+import pandas as pd
+from report_paths import default_cache_dir
+
+
+CACHE_VERSION = 3
+INDEX_FILENAME = "index.json"
+
+
+def file_fingerprint(path, known=None):
+    # Size and mtime are cheap; the content hash is only recomputed when they change
+    stat = os.stat(path)
+    fingerprint = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+    if known and known.get("size") == stat.st_size and known.get("mtime_ns") == stat.st_mtime_ns:
+        fingerprint["sha1"] = known["sha1"]
+        return fingerprint
+
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    fingerprint["sha1"] = digest.hexdigest()
+    return fingerprint
+
+
+class StatementCache:
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+        self.index_path = os.path.join(cache_dir, INDEX_FILENAME)
+        self.entries = {}
+        self.dirty = False
+        self.load_index()
+
+    def load_index(self):
+        if not os.path.exists(self.index_path):
+            return
+        try:
+            with open(self.index_path, "r") as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            return
+        # Entries written by an older parser are ignored and rebuilt
+        if index.get("version") == CACHE_VERSION:
+            self.entries = index.get("entries", {})
+
+    def save_index(self):
+        if not self.dirty:
+            return
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = self.index_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"version": CACHE_VERSION, "entries": self.entries}, f)
+        os.replace(tmp_path, self.index_path)
+        self.dirty = False
+
+    def entry_path(self, sha1):
+        return os.path.join(self.cache_dir, f"{sha1}.pkl")
+
+    def lookup(self, path):
+        # Returns (frame or None, fingerprint); the fingerprint is reused by store()
+        key = os.path.abspath(path)
+        known = self.entries.get(key)
+        fingerprint = file_fingerprint(path, known)
+
+        if known and known["sha1"] == fingerprint["sha1"]:
+            entry_path = self.entry_path(fingerprint["sha1"])
+            if os.path.exists(entry_path):
+                try:
+                    df = pd.read_pickle(entry_path)
+                except Exception:
+                    return None, fingerprint
+                if known != fingerprint:
+                    self.entries[key] = fingerprint
+                    self.dirty = True
+                return df, fingerprint
+        return None, fingerprint
+
+    def store(self, path, df, fingerprint=None):
+        key = os.path.abspath(path)
+        if fingerprint is None:
+            fingerprint = file_fingerprint(path)
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+        previous = self.entries.get(key)
+        df.to_pickle(self.entry_path(fingerprint["sha1"]))
+        self.entries[key] = fingerprint
+        self.dirty = True
+
+        if previous and previous["sha1"] != fingerprint["sha1"]:
+            self.remove_entry_file(previous["sha1"])
+
+    def evict(self, path):
+        key = os.path.abspath(path)
+        entry = self.entries.pop(key, None)
+        if entry is None:
+            return False
+        self.dirty = True
+        self.remove_entry_file(entry["sha1"])
+        return True
+
+    def prune(self, keep_paths):
+        # Drop entries for statements that are no longer in the folder
+        keep = {os.path.abspath(p) for p in keep_paths}
+        removed = 0
+        for key in [k for k in self.entries if k not in keep]:
+            self.evict(key)
+            removed += 1
+        return removed
+
+    def clear(self):
+        for key in list(self.entries):
+            self.evict(key)
+        if os.path.isdir(self.cache_dir):
+            for name in os.listdir(self.cache_dir):
+                # Statement entries, and the category cube saved alongside them
+                if name.endswith((".pkl", ".npz")):
+                    os.remove(os.path.join(self.cache_dir, name))
+        self.save_index()
+
+    def remove_entry_file(self, sha1):
+        # Identical statements saved under two names share one entry file
+        if any(e["sha1"] == sha1 for e in self.entries.values()):
+            return
+        entry_path = self.entry_path(sha1)
+        if os.path.exists(entry_path):
+            os.remove(entry_path)
+
+
+def clear_statement_cache(folder_path, cache_dir=None):
+    cache = StatementCache(cache_dir or default_cache_dir(folder_path))
+    cache.clear()
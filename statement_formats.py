@@ -0,0 +1,390 @@
+import os
+import re
+import csv
+import html
+import itertools
+from datetime import datetime, date
+from functools import lru_cache
+import pandas as pd
+import numpy as np
+from openpyxl import load_workbook
+
+
+# Every adapter produces a frame with these columns: dates as datetime64, amounts as float64 with
+# charges positive and payments negative (the Discover convention the reports are built around)
+STATEMENT_COLUMNS = ["Trans. date", "Post date", "Description", "Amount", "Category"]
+STATEMENT_EXTENSIONS = (".xlsx", ".csv", ".ofx", ".qfx")
+OFX_EXTENSIONS = (".ofx", ".qfx")
+
+# Rows searched for the header row; exports put account details of varying length above it
+HEADER_SEARCH_ROWS = 20
+# Bytes read when checking whether a file is OFX
+OFX_SNIFF_BYTES = 4096
+# Rows per chunk when a reader is not asked for a size
+STREAM_CHUNK_ROWS = 50000
+
+# Exports without a category column; the summary treats anything named like this as a payment
+UNCATEGORIZED = "Uncategorized"
+CREDITS_CATEGORY = "Payments and Credits"
+
+
+def header_key(value):
+    return str(value).strip().lower() if value is not None else ""
+
+
+class StatementFormat:
+    # One issuer's tabular export. columns maps a statement column (or a marker column that only
+    # helps tell issuers apart, like Chase's "Type") to its header text; all of them must be present.
+    # Amounts come either from one signed column or from separate Debit and Credit columns
+    def __init__(self, name, columns, optional=None, date_format="%m/%d/%Y", charges_negative=False):
+        self.name = name
+        self.columns = columns
+        self.optional = optional or {}
+        self.date_format = date_format
+        self.charges_negative = charges_negative
+
+    def __repr__(self):
+        return f"StatementFormat({self.name!r})"
+
+    def match(self, row):
+        # Returns {column: position} when row is this format's header, else None
+        headers = {}
+        for position, cell in enumerate(row):
+            headers.setdefault(header_key(cell), position)
+        positions = {}
+        for column, header in self.columns.items():
+            if header not in headers:
+                return None
+            positions[column] = headers[header]
+        for column, header in self.optional.items():
+            if header in headers:
+                positions[column] = headers[header]
+        return positions
+
+    def finish(self, df):
+        # df holds the parsed columns this export has; fills in the rest and applies the sign convention
+        if "Amount" not in df:
+            debit = df.pop("Debit").abs()
+            credit = df.pop("Credit").abs()
+            # Some issuers print credits as negative numbers, some as positive ones
+            df["Amount"] = debit.fillna(0) - credit.fillna(0)
+            df.loc[debit.isna() & credit.isna(), "Amount"] = float("nan")
+        elif self.charges_negative:
+            df["Amount"] = 0.0 - df["Amount"]
+        if "Post date" not in df:
+            df["Post date"] = pd.Series(pd.NaT, index=df.index, dtype="datetime64[ns]")
+        # Exports without a category column would drop out of every report, so their rows get one from
+        # their sign. Blank categories in an export that has the column are left blank, as before
+        if "Category" not in df:
+            df["Category"] = default_categories(df["Amount"])
+        return df[STATEMENT_COLUMNS]
+
+
+def default_categories(amounts):
+    return pd.Series(np.where(amounts.to_numpy() < 0, CREDITS_CATEGORY, UNCATEGORIZED), index=amounts.index)
+
+
+# Tried in order; when several match the same header row the one recognizing the most columns wins
+STATEMENT_FORMATS = [
+    StatementFormat("Discover", {"Trans. date": "trans. date", "Description": "description", "Amount": "amount"},
+                    {"Post date": "post date", "Category": "category"}),
+    StatementFormat("Chase", {"Trans. date": "transaction date", "Post date": "post date", "Description": "description",
+                              "Amount": "amount", "Type": "type"},
+                    {"Category": "category"}, charges_negative=True),
+    StatementFormat("Capital One", {"Trans. date": "transaction date", "Post date": "posted date",
+                                    "Description": "description", "Debit": "debit", "Credit": "credit"},
+                    {"Category": "category"}, date_format="%Y-%m-%d"),
+    StatementFormat("Citi", {"Trans. date": "date", "Description": "description", "Debit": "debit", "Credit": "credit",
+                             "Status": "status"}),
+    StatementFormat("American Express", {"Trans. date": "date", "Description": "description", "Amount": "amount"},
+                    {"Category": "category"}),
+]
+
+
+def register_statement_format(statement_format):
+    # Formats registered later are tried after the built-in ones
+    STATEMENT_FORMATS.append(statement_format)
+    cached_sniff.cache_clear()
+
+
+def match_header(rows):
+    # Returns (row index, format, positions) for the first row a registered format recognizes
+    for index, row in enumerate(rows):
+        best = None
+        for statement_format in STATEMENT_FORMATS:
+            positions = statement_format.match(row)
+            if positions is not None and (best is None or len(positions) > len(best[1])):
+                best = (statement_format, positions)
+        if best:
+            return index, best[0], best[1]
+    return None
+
+
+def is_ofx(path):
+    with open(path, "rb") as f:
+        head = f.read(OFX_SNIFF_BYTES).upper()
+    return b"OFXHEADER" in head or b"<OFX>" in head
+
+
+def xlsx_head_rows(path, rows=HEADER_SEARCH_ROWS):
+    wb = load_workbook(path, read_only=True, data_only=True, keep_links=False)
+    try:
+        ws = wb.worksheets[0]
+        ws.reset_dimensions()
+        return [tuple(row) for row in ws.iter_rows(max_row=rows, values_only=True)]
+    finally:
+        wb.close()
+
+
+def csv_head_rows(path, rows=HEADER_SEARCH_ROWS):
+    with open(path, "r", newline="", encoding="utf-8-sig") as f:
+        return [row for _, row in zip(range(rows), csv.reader(f))]
+
+
+def sniff_statement(path):
+    # Names the format of a statement from its first few rows, or returns None
+    extension = os.path.splitext(path)[1].lower()
+    if extension in OFX_EXTENSIONS:
+        return "OFX" if is_ofx(path) else None
+    if extension == ".xlsx":
+        match = match_header(xlsx_head_rows(path))
+    elif extension == ".csv":
+        match = match_header(csv_head_rows(path))
+    else:
+        return None
+    return match[1].name if match else None
+
+
+@lru_cache(maxsize=1024)
+def cached_sniff(path, size, mtime_ns):
+    try:
+        return sniff_statement(path)
+    except Exception:
+        # Unreadable or foreign files are simply not statements
+        return None
+
+
+def detect_statement_format(path):
+    # Folder listings run on every report, so a file is only sniffed again once it changes
+    stat = os.stat(path)
+    return cached_sniff(os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+
+
+def unrecognized(path):
+    return ValueError(f"Unrecognized statement format: {os.path.basename(path)}")
+
+
+def parse_statement_date(value, seen, date_format="%m/%d/%Y"):
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, date):
+        return datetime(value.year, value.month, value.day)
+    if isinstance(value, str):
+        # A statement only has a few dozen distinct dates, so each string is parsed once
+        if value not in seen:
+            try:
+                seen[value] = datetime.strptime(value.strip(), date_format)
+            except ValueError:
+                seen[value] = None
+        return seen[value]
+    return None
+
+
+def parse_statement_amount(value):
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        try:
+            return float(value.replace("$", "").replace(",", ""))
+        except ValueError:
+            pass
+    return float("nan")
+
+
+def statement_frame(trans_dates, post_dates, descriptions, amounts, categories):
+    return pd.DataFrame({
+        "Trans. date": pd.Series(trans_dates, dtype="datetime64[ns]"),
+        "Post date": pd.Series(post_dates, dtype="datetime64[ns]"),
+        "Description": pd.Series(descriptions),
+        "Amount": pd.Series(amounts, dtype="float64"),
+        "Category": pd.Series(categories),
+    })
+
+
+def empty_statement_frame():
+    return statement_frame([], [], [], [], [])
+
+
+COLUMN_DTYPES = {"Trans. date": "datetime64[ns]", "Post date": "datetime64[ns]", "Amount": "float64", "Debit": "float64",
+                 "Credit": "float64"}
+
+
+def text_value(value):
+    return None if value is None else str(value)
+
+
+def statement_fields(positions):
+    # The columns a reader has to parse; marker columns only served detection
+    return {column: position for column, position in positions.items()
+            if column in STATEMENT_COLUMNS or column in ("Debit", "Credit")}
+
+
+def typed_frame(statement_format, columns):
+    df = pd.DataFrame({column: pd.Series(values, dtype=COLUMN_DTYPES.get(column))
+                       for column, values in columns.items()})
+    return statement_format.finish(df)
+
+
+def iter_xlsx_statement_chunks(path, chunk_size=None):
+    seen_dates = {}
+    yielded = False
+
+    # Read-only mode streams the sheet XML without building styled cells
+    wb = load_workbook(path, read_only=True, data_only=True, keep_links=False)
+    try:
+        ws = wb.worksheets[0]
+        ws.reset_dimensions()
+        rows = ws.iter_rows(values_only=True)
+        # The header is found in the same pass that then reads the rows below it
+        head = [tuple(row) for row in itertools.islice(rows, HEADER_SEARCH_ROWS)]
+        match = match_header(head)
+        if match is None:
+            raise unrecognized(path)
+        index, statement_format, positions = match
+        fields = statement_fields(positions)
+        width = max(fields.values()) + 1
+        date_position = fields.pop("Trans. date")
+
+        def parse_date(value):
+            return parse_statement_date(value, seen_dates, statement_format.date_format)
+
+        converters = [(column, position, parse_date if column == "Post date" else
+                       text_value if column not in COLUMN_DTYPES else parse_statement_amount)
+                      for column, position in fields.items()]
+        columns = {"Trans. date": [], **{column: [] for column in fields}}
+
+        for row in itertools.chain(head[index + 1:], rows):
+            if len(row) < width:
+                row = tuple(row) + (None,) * (width - len(row))
+            trans_date = parse_date(row[date_position])
+            if trans_date is None:
+                continue
+            columns["Trans. date"].append(trans_date)
+            for column, position, convert in converters:
+                columns[column].append(convert(row[position]))
+            if chunk_size and len(columns["Trans. date"]) >= chunk_size:
+                yield typed_frame(statement_format, columns)
+                yielded = True
+                columns = {column: [] for column in columns}
+    finally:
+        wb.close()
+
+    if columns["Trans. date"] or not yielded:
+        yield typed_frame(statement_format, columns)
+
+
+def csv_header(path):
+    # Returns (header line index, format, positions); only the first few lines are read
+    match = match_header(csv_head_rows(path))
+    if match is None:
+        raise unrecognized(path)
+    return match
+
+
+def csv_dates(values, date_format):
+    return pd.to_datetime(values.str.strip(), format=date_format, errors="coerce").astype("datetime64[ns]")
+
+
+def csv_amounts(values):
+    values = values.str.strip()
+    # Plain numbers are the norm; currency symbols and thousands separators only cost a pass when present
+    if values.str.contains(r"[$,]", regex=True).any():
+        values = values.str.replace(r"[$,]", "", regex=True)
+    return pd.to_numeric(values, errors="coerce").astype("float64")
+
+
+def iter_csv_statement_chunks(path, chunk_size=None):
+    # Columns are read as text and converted the same way the .xlsx reader converts cells
+    index, statement_format, positions = csv_header(path)
+    fields = statement_fields(positions)
+    reader = pd.read_csv(path, skiprows=index + 1, header=None, usecols=sorted(fields.values()), dtype=str,
+                         keep_default_na=False, encoding="utf-8-sig", chunksize=chunk_size or STREAM_CHUNK_ROWS)
+    date_position = fields.pop("Trans. date")
+    yielded = False
+    with reader:
+        for chunk in reader:
+            trans_dates = csv_dates(chunk[date_position], statement_format.date_format)
+            keep = trans_dates.notna()
+            chunk = chunk[keep]
+            if chunk.empty:
+                continue
+            df = pd.DataFrame({"Trans. date": trans_dates[keep]})
+            for column, position in fields.items():
+                values = chunk[position]
+                if column == "Post date":
+                    df[column] = csv_dates(values, statement_format.date_format)
+                elif column in COLUMN_DTYPES:
+                    df[column] = csv_amounts(values)
+                else:
+                    df[column] = values.mask(values == "")
+            yield statement_format.finish(df.reset_index(drop=True))
+            yielded = True
+    if not yielded:
+        yield empty_statement_frame()
+
+
+OFX_TRANSACTION = re.compile(r"<STMTTRN>(.*?)(?:</STMTTRN>|(?=<STMTTRN>)|(?=</BANKTRANLIST>))", re.S | re.I)
+OFX_FIELD = re.compile(r"<(\w+)>([^<\r\n]*)")
+
+
+def ofx_date(value):
+    # YYYYMMDD, optionally followed by a time and a [offset:zone] suffix
+    try:
+        return datetime.strptime(value.strip()[:8], "%Y%m%d")
+    except ValueError:
+        return None
+
+
+def iter_ofx_statement_chunks(path, chunk_size=None):
+    # OFX 1.x is SGML without closing tags for leaf elements and 2.x is XML; both keep one field per tag.
+    # Amounts are signed from the account holder's side, so charges are negative
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        text = f.read()
+    trans_dates, post_dates, descriptions, amounts = [], [], [], []
+    for match in OFX_TRANSACTION.finditer(text):
+        fields = {tag.upper(): value.strip() for tag, value in OFX_FIELD.findall(match.group(1))}
+        posted = ofx_date(fields.get("DTPOSTED", ""))
+        trans_date = ofx_date(fields.get("DTUSER", "")) or posted
+        if trans_date is None:
+            continue
+        trans_dates.append(trans_date)
+        post_dates.append(posted)
+        description = fields.get("NAME") or fields.get("MEMO")
+        descriptions.append(html.unescape(description) if description else None)
+        amounts.append(0.0 - parse_statement_amount(fields.get("TRNAMT", "")))
+
+    df = pd.DataFrame({
+        "Trans. date": pd.Series(trans_dates, dtype="datetime64[ns]"),
+        "Post date": pd.Series(post_dates, dtype="datetime64[ns]"),
+        "Description": pd.Series(descriptions),
+        "Amount": pd.Series(amounts, dtype="float64"),
+    })
+    df["Category"] = default_categories(df["Amount"])
+    step = chunk_size or len(df) or 1
+    for start in range(0, max(len(df), 1), step):
+        yield df.iloc[start:start + step].reset_index(drop=True)
+
+
+def iter_statement_chunks(path, chunk_size=None):
+    # Without a chunk size an .xlsx or OFX statement comes back as one frame
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".csv":
+        return iter_csv_statement_chunks(path, chunk_size)
+    if extension in OFX_EXTENSIONS:
+        return iter_ofx_statement_chunks(path, chunk_size)
+    return iter_xlsx_statement_chunks(path, chunk_size)
+
+
+def read_statement(path):
+    chunks = list(iter_statement_chunks(path))
+    return chunks[0] if len(chunks) == 1 else pd.concat(chunks, ignore_index=True)
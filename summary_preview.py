@@ -0,0 +1,57 @@
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+from expense_sorter import build_periods, excel_period_suffix
+
+
+# (start, end, group mode) results kept before the least recently used one is dropped
+PREVIEW_CACHE_SIZE = 64
+
+
+class SummaryPreview:
+    # Per-period and per-category totals for the GUI preview, answered from a CategoryCube held in
+    # memory, so changing the range or grouping never goes back to the statements or the disk
+    def __init__(self, cube, cache_size=PREVIEW_CACHE_SIZE):
+        self.cube = cube
+        self.cache_size = cache_size
+        self.cache = OrderedDict()
+
+    def query(self, start_date, end_date, group_mode):
+        key = (pd.Timestamp(start_date).normalize(), pd.Timestamp(end_date).normalize(), group_mode.lower())
+        if key in self.cache:
+            self.cache.move_to_end(key)
+            return self.cache[key]
+        result = self.compute(*key[:2], group_mode)
+        self.cache[key] = result
+        if len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+        return result
+
+    def compute(self, start_date, end_date, group_mode):
+        # {"total": row for the whole range, "periods": [row per period with transactions]} where a row is
+        # {"label", "payments", "expenses", "net", "count", "categories": [(category, amount, count)]}
+        # with categories largest first, as on the Summary sheets
+        cube = self.cube
+        if end_date < start_date:
+            return {"total": None, "periods": []}
+        periods = build_periods(start_date, end_date, group_mode)
+        cents, counts = cube.period_totals(periods + [(start_date, end_date)])
+        rows = [summary_row(cube, excel_period_suffix(i + 1, start, end, group_mode), cents[i], counts[i])
+                for i, (start, end) in enumerate(periods) if counts[i].any()]
+        total = summary_row(cube, "Total", cents[-1], counts[-1]) if counts[-1].any() else None
+        return {"total": total, "periods": rows}
+
+
+def summary_row(cube, label, cents, counts):
+    present = np.flatnonzero(counts)
+    order = present[np.argsort(-cents[present], kind="stable")]
+    payments = int(cents[cube.is_payment].sum())
+    expenses = int(cents[~cube.is_payment].sum())
+    return {
+        "label": label,
+        "payments": payments / 100,
+        "expenses": expenses / 100,
+        "net": (payments + expenses) / 100,
+        "count": int(counts.sum()),
+        "categories": [(cube.categories[index], int(cents[index]) / 100, int(counts[index])) for index in order],
+    }
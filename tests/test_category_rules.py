@@ -0,0 +1,60 @@
+import os
+import re
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from category_rules import CategoryRules, required_literal
+
+
+DESCRIPTIONS = [
+    "AMAZON MKTPLACE PMTS AMZN.COM/BILL WA", "amazon  mktp us*2k4", "AMZN Mktp US", "Amazon.com",
+    "UBER *EATS PENDING", "UBER TRIP HELP.UBER.COM", "uber   eats",
+    "DELTA AIR 0062345 ATLANTA", "DELTA AIR LINES", "SOUTHWEST AIR 5262",
+    "STARBUCKS STORE 1234", "STARBUCK 99", "STARBUCKSS",
+    "COSTCO WHSE #0123", "COSTCOWHSE 55", "COSTCO GAS",
+    "CHIPOTLE ONLINE", "TST* CHIPOTLE 2231", "SHELL OIL 57442", "Shell Service Station",
+    "INTERNET PAYMENT - THANK YOU", "PAYMENT 1234", "KROGER #412 [FUEL]", "KROGER 412 FUEL",
+]
+
+# Regexes the prefilter can narrow down to the descriptions containing a literal
+WITH_LITERAL = [r"AMAZON\s+MKTP", r"DELTA AIR \d+", r"uber.*eats", r"^TST\* CHIPOTLE", r"STARBUCKS?",
+                r"COSTCO(WHSE)?", r"KROGER #\d+ \[FUEL\]", r"PAYMENT\b", r"[A-Z]+ AIR LINES", r"[A-Z]{4} \d", r"\bU\w+"]
+# Regexes that are tried on every description
+WITHOUT_LITERAL = [r"AMAZON|AMZN", r"(?i)shell", r"\d{4}$", r"[A-Z]{5}\d", r"^\S+$"]
+
+
+class RequiredLiteralTest(unittest.TestCase):
+    def test_literals(self):
+        for pattern in WITH_LITERAL:
+            with self.subTest(pattern=pattern):
+                literal = required_literal(pattern)
+                self.assertTrue(literal)
+                # Every match contains the literal, so skipping descriptions without it cannot lose one
+                for description in DESCRIPTIONS:
+                    if re.search(pattern, description, re.I | re.S):
+                        self.assertIn(literal.lower(), description.lower())
+        for pattern in WITHOUT_LITERAL:
+            with self.subTest(pattern=pattern):
+                self.assertEqual(required_literal(pattern), "")
+
+    def test_regex_rules_match_like_re_search(self):
+        for pattern in WITH_LITERAL + WITHOUT_LITERAL:
+            with self.subTest(pattern=pattern):
+                rules = CategoryRules([{"pattern": pattern, "category": "Matched", "match": "regex"}])
+                self.assertEqual([rules.match(description) is not None for description in DESCRIPTIONS],
+                                 [bool(re.search(pattern, description, re.I | re.S)) for description in DESCRIPTIONS])
+
+    def test_first_matching_regex_wins(self):
+        patterns = WITHOUT_LITERAL[:2] + WITH_LITERAL + WITHOUT_LITERAL[2:]
+        rules = CategoryRules([{"pattern": pattern, "category": str(index), "match": "regex"}
+                               for index, pattern in enumerate(patterns)])
+        for description in DESCRIPTIONS:
+            with self.subTest(description=description):
+                expected = next((index for index, pattern in enumerate(patterns)
+                                 if re.search(pattern, description, re.I | re.S)), None)
+                self.assertEqual(rules.match(description), expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,52 @@
+import os
+import sys
+import unittest
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from expense_sorter import concat_statements
+
+
+COFFEE = ("2024-03-04", "2024-03-05", "BLUE BOTTLE COFFEE", 6.5)
+LUNCH = ("2024-03-04", "2024-03-05", "CHIPOTLE ONLINE", 14.25)
+FLIGHT = ("2024-03-09", "2024-03-11", "DELTA AIR 0062", 412.8)
+
+
+def statement(*rows):
+    df = pd.DataFrame(rows, columns=["Trans. date", "Post date", "Description", "Amount"])
+    df["Trans. date"] = pd.to_datetime(df["Trans. date"])
+    df["Post date"] = pd.to_datetime(df["Post date"])
+    df["Category"] = "Restaurants"
+    return df
+
+
+def descriptions(df):
+    return sorted(df["Description"])
+
+
+class DeduplicationTest(unittest.TestCase):
+    def test_repeat_inside_one_statement_is_kept(self):
+        # Two coffees on the same day are two charges
+        df = concat_statements([statement(COFFEE, COFFEE, LUNCH), statement(FLIGHT)])
+        self.assertEqual(descriptions(df), sorted([COFFEE[2], COFFEE[2], LUNCH[2], FLIGHT[2]]))
+
+    def test_repeat_across_overlapping_statements_is_dropped_once(self):
+        messages = []
+        df = concat_statements([statement(COFFEE, LUNCH), statement(LUNCH, FLIGHT)], log=messages.append)
+        self.assertEqual(descriptions(df), sorted([COFFEE[2], LUNCH[2], FLIGHT[2]]))
+        self.assertEqual(messages, ["Dropped 1 duplicate transactions from overlapping statements"])
+
+    def test_copies_are_matched_by_occurrence(self):
+        # The overlap repeats one of the two coffees; the second one in the later statement is a new charge
+        df = concat_statements([statement(COFFEE, COFFEE), statement(COFFEE)])
+        self.assertEqual(descriptions(df), [COFFEE[2]] * 2)
+        df = concat_statements([statement(COFFEE), statement(COFFEE, COFFEE)])
+        self.assertEqual(descriptions(df), [COFFEE[2]] * 2)
+
+    def test_keep_duplicates(self):
+        df = concat_statements([statement(COFFEE, LUNCH), statement(LUNCH, FLIGHT)], deduplicate=False)
+        self.assertEqual(len(df), 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
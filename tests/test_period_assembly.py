@@ -0,0 +1,102 @@
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+from openpyxl import load_workbook
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from expense_sorter import build_periods, render_report
+from render_cache import RenderCache
+
+
+CATEGORIES = ["Merchandise", "Restaurants", "Travel/ Entertainment", "Awards and Rebate Credits", "Payments and Credits"]
+
+
+def sample_transactions(rows=600, seed=7):
+    # Two years of charges, so sheets of the same month or half month in both years collide once cut to
+    # 31 characters; biweekly summaries collide too, which renames the sheet their chart points at
+    rng = np.random.default_rng(seed)
+    dates = pd.Timestamp("2023-01-01") + pd.to_timedelta(rng.integers(0, 730, rows), unit="D")
+    categories = rng.choice(CATEGORIES, rows)
+    amounts = np.round(rng.uniform(5, 500, rows), 2)
+    amounts[np.isin(categories, CATEGORIES[3:])] *= -1
+    return pd.DataFrame({
+        "Trans. date": dates,
+        "Post date": dates + pd.to_timedelta(rng.integers(0, 3, rows), unit="D"),
+        "Description": rng.choice(["AMAZON MKTPLACE PMTS", "CHIPOTLE ONLINE", "DELTA AIR 0062", "INTERNET PAYMENT"], rows),
+        "Amount": amounts,
+        "Category": categories,
+    }).sort_values("Trans. date", ignore_index=True)
+
+
+def workbook_contents(path):
+    wb = load_workbook(path)
+    sheets = []
+    for ws in wb.worksheets:
+        cells = [(cell.coordinate, cell.value, cell.number_format, cell.font.b,
+                  cell.font.color.rgb if cell.font.color else None, cell.alignment.horizontal)
+                 for row in ws.iter_rows() for cell in row if cell.value is not None or cell.has_style]
+        charts = [(type(chart).__name__, [series.val.numRef.f for series in chart.series],
+                   [series.cat.strRef.f if series.cat.strRef else series.cat.numRef.f for series in chart.series])
+                  for chart in ws._charts]
+        widths = {column: dimension.width for column, dimension in ws.column_dimensions.items()}
+        sheets.append((ws.title, cells, charts, widths, sorted(str(merged) for merged in ws.merged_cells.ranges)))
+    return sheets
+
+
+class PeriodAssemblyTest(unittest.TestCase):
+    # Reports stitched from per-period workbooks (parallel rendering and the render cache) must match
+    # the workbook rendered serially in one pass
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.df = sample_transactions()
+
+    def tearDown(self):
+        shutil.rmtree(self.folder, ignore_errors=True)
+
+    def periods(self, group_mode):
+        return build_periods(pd.Timestamp("2023-01-01"), pd.Timestamp("2024-12-31"), group_mode)
+
+    def render(self, name, chart_type, group_mode="Monthly", **kwargs):
+        periods = self.periods(group_mode)
+        output_path = os.path.join(self.folder, f"{name}.xlsx")
+        return render_report(self.df, periods, group_mode, False, chart_type, False, self.folder, name, output_path,
+                             **kwargs)
+
+    def test_stitched_reports_match_serial(self):
+        for group_mode, chart_type in [("Monthly", "Pie"), ("Monthly", "Bar"), ("Monthly", "Radar"), ("Biweekly", "Bar")]:
+            with self.subTest(group_mode=group_mode, chart_type=chart_type):
+                name = f"{group_mode}_{chart_type}"
+                serial = workbook_contents(self.render(f"serial_{name}", chart_type, group_mode))
+                titles = [title for title, *_ in serial]
+                self.assertEqual(len(titles), len(set(titles)))
+                self.assertEqual(workbook_contents(self.render(f"parallel_{name}", chart_type, group_mode, period_workers=2)),
+                                 serial)
+
+                cache = RenderCache(os.path.join(self.folder, f"renders_{name}"))
+                self.assertEqual(workbook_contents(self.render(f"cold_{name}", chart_type, group_mode, render_cache=cache)),
+                                 serial)
+                self.assertEqual(workbook_contents(self.render(f"warm_{name}", chart_type, group_mode, render_cache=cache)),
+                                 serial)
+                self.assertEqual(cache.hits, len(self.periods(group_mode)))
+
+    def test_renamed_sheets_keep_their_period(self):
+        titles = [title for title, *_ in workbook_contents(self.render("serial", "Pie"))]
+        self.assertIn("Travel- Entertainmen_January 20", titles)
+        self.assertIn("Travel- Entertain2_January 2024", titles)
+
+    def test_damaged_cached_period_is_rendered_again(self):
+        cache = RenderCache(os.path.join(self.folder, "renders"))
+        serial = workbook_contents(self.render("serial", "Pie"))
+        self.render("cold", "Pie", render_cache=cache)
+        for name in sorted(os.listdir(cache.cache_dir))[:3]:
+            with open(os.path.join(cache.cache_dir, name), "wb") as f:
+                f.write(b"not a workbook")
+        self.assertEqual(workbook_contents(self.render("warm", "Pie", render_cache=cache)), serial)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,127 @@
+import os
+import sqlite3
+import pandas as pd
+from statement_cache import file_fingerprint
+
+
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sources (
+    path TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    sha1 TEXT NOT NULL,
+    folder TEXT
+);
+CREATE TABLE IF NOT EXISTS transactions (
+    source TEXT NOT NULL,
+    row_no INTEGER NOT NULL,
+    trans_date TEXT NOT NULL,
+    post_date TEXT,
+    description TEXT,
+    amount REAL,
+    category TEXT,
+    PRIMARY KEY (source, row_no)
+);
+CREATE INDEX IF NOT EXISTS transactions_trans_date ON transactions (trans_date);
+CREATE INDEX IF NOT EXISTS transactions_category_date ON transactions (category, trans_date);
+"""
+
+
+class TransactionStore:
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self.conn = sqlite3.connect(db_path)
+        self.conn.executescript(SCHEMA)
+        self.migrate()
+
+    def migrate(self):
+        # Stores written before statements were tied to their folder learn it from each path
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(sources)")}
+        if "folder" not in columns:
+            with self.conn:
+                self.conn.execute("ALTER TABLE sources ADD COLUMN folder TEXT")
+                paths = [row[0] for row in self.conn.execute("SELECT path FROM sources")]
+                self.conn.executemany("UPDATE sources SET folder = ? WHERE path = ?",
+                                      [(os.path.dirname(path), path) for path in paths])
+        # One store can hold several statement folders; every query is limited to one of them
+        self.conn.execute("CREATE INDEX IF NOT EXISTS sources_folder ON sources (folder)")
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def stale_sources(self, paths):
+        # Returns [(path, fingerprint)] for statements that are new or changed since ingestion
+        known = {row[0]: {"size": row[1], "mtime_ns": row[2], "sha1": row[3]}
+                 for row in self.conn.execute("SELECT path, size, mtime_ns, sha1 FROM sources")}
+        stale = []
+        for path in paths:
+            key = os.path.abspath(path)
+            fingerprint = file_fingerprint(path, known.get(key))
+            if known.get(key) != fingerprint:
+                if key in known and known[key]["sha1"] == fingerprint["sha1"]:
+                    # Touched but unchanged; just record the new stat
+                    with self.conn:
+                        self.conn.execute("UPDATE sources SET size = ?, mtime_ns = ? WHERE path = ?",
+                                          (fingerprint["size"], fingerprint["mtime_ns"], key))
+                    continue
+                stale.append((path, fingerprint))
+        return stale
+
+    def replace_source(self, path, fingerprint, df):
+        key = os.path.abspath(path)
+        rows = zip(
+            [key] * len(df),
+            range(len(df)),
+            df["Trans. date"].dt.strftime(DATE_FORMAT),
+            df["Post date"].dt.strftime(DATE_FORMAT).astype(object).where(df["Post date"].notna(), None),
+            df["Description"].astype(object).where(df["Description"].notna(), None),
+            df["Amount"].astype(object).where(df["Amount"].notna(), None),
+            df["Category"].astype(object).where(df["Category"].notna(), None),
+        )
+        with self.conn:
+            self.conn.execute("DELETE FROM transactions WHERE source = ?", (key,))
+            self.conn.executemany("INSERT INTO transactions VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+            self.conn.execute("INSERT OR REPLACE INTO sources (path, name, size, mtime_ns, sha1, folder) VALUES (?, ?, ?, ?, ?, ?)",
+                              (key, os.path.basename(path), fingerprint["size"], fingerprint["mtime_ns"], fingerprint["sha1"],
+                               os.path.dirname(key)))
+
+    def remove_missing(self, folder_path, paths):
+        keep = {os.path.abspath(p) for p in paths}
+        removed = [row[0] for row in self.conn.execute("SELECT path FROM sources WHERE folder = ?",
+                                                        (os.path.abspath(folder_path),))
+                   if row[0] not in keep]
+        with self.conn:
+            for key in removed:
+                self.conn.execute("DELETE FROM transactions WHERE source = ?", (key,))
+                self.conn.execute("DELETE FROM sources WHERE path = ?", (key,))
+        return len(removed)
+
+    def query(self, folder_path, start_date, end_date, categories=None, with_source=False):
+        # Statements of folder_path only. Same inclusive bounds as the date filter applied to loaded frames
+        sql = ("SELECT t.trans_date, t.post_date, t.description, t.amount, t.category, t.source "
+               "FROM transactions t JOIN sources s ON s.path = t.source "
+               "WHERE s.folder = ? AND t.trans_date >= ? AND t.trans_date <= ?")
+        params = [os.path.abspath(folder_path), start_date.strftime(DATE_FORMAT), end_date.strftime(DATE_FORMAT)]
+        if categories:
+            sql += f" AND t.category IN ({', '.join('?' * len(categories))})"
+            params += list(categories)
+        # Same order as concatenating the statements by file name
+        sql += " ORDER BY s.name, t.source, t.row_no"
+
+        df = pd.read_sql_query(sql, self.conn, params=params)
+        df.columns = ["Trans. date", "Post date", "Description", "Amount", "Category", "Source"]
+        if not with_source:
+            df = df.drop(columns="Source")
+        df["Trans. date"] = pd.to_datetime(df["Trans. date"], format=DATE_FORMAT)
+        df["Post date"] = pd.to_datetime(df["Post date"], format=DATE_FORMAT)
+        df["Amount"] = df["Amount"].astype("float64")
+        return df